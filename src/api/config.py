@@ -15,6 +15,8 @@ openai_key = os.getenv("OPENAI_KEY")
 
 # containers
 services_url = os.getenv("SERVICES_CONTAINER_URL")
+# inputs per services request on /embed/stream, at most the services batch limit
+embed_stream_batch_size = int(os.getenv("EMBED_STREAM_BATCH_SIZE", 64))
 
 # cloud
 mongodb_atlas = {
@@ -1,17 +1,24 @@
+from typing import Optional
+
 from fastapi import APIRouter, Request
 from rate_limiter import limiter
 
 from _exceptions import route_exception_handler
 
 
+from .encoding import EmbeddingEncoding
 from .model import (
+    Modality,
     EmbeddingRequest,
     EmbeddingResponse,
+    BatchEmbeddingRequest,
+    BatchEmbeddingResponse,
     ConfigsRequest,
     ConfigsResponse,
 )
 
 from .service import EmbeddingHandler
+from utilities.methods import NDJSONStreamingResponse, iter_ndjson
 
 router = APIRouter()
 
@@ -38,3 +45,40 @@ async def embed_config(request: Request, data: ConfigsRequest):
 async def embed(request: Request, data: EmbeddingRequest):
     embedding_handler = EmbeddingHandler()
     return await embedding_handler.encode(data)
+
+
+# mixpeek.embed_batch
+@router.post(
+    "/batch",
+    response_model=BatchEmbeddingResponse,
+    openapi_extra={"x-fern-sdk-method-name": "embed_batch"},
+)
+@route_exception_handler
+async def embed_batch(request: Request, data: BatchEmbeddingRequest):
+    embedding_handler = EmbeddingHandler()
+    return await embedding_handler.encode_batch(data)
+
+
+# mixpeek.embed_stream
+@router.post(
+    "/stream",
+    response_class=NDJSONStreamingResponse,
+    openapi_extra={"x-fern-sdk-method-name": "embed_stream"},
+)
+@route_exception_handler
+async def embed_stream(
+    request: Request,
+    modality: Modality = Modality.TEXT,
+    model: Optional[str] = None,
+    encoding: EmbeddingEncoding = EmbeddingEncoding.FLOAT,
+):
+    """
+    Send one input per line as NDJSON (a JSON string or {"input": ...}) and
+    read {"index": ..., "embedding": ...} lines back as they are embedded.
+    """
+    embedding_handler = EmbeddingHandler()
+    return NDJSONStreamingResponse(
+        embedding_handler.encode_stream(
+            iter_ndjson(request.stream()), modality, model, encoding
+        )
+    )
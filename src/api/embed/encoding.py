@@ -0,0 +1,29 @@
+import base64
+from enum import Enum
+
+import numpy as np
+
+
+class EmbeddingEncoding(str, Enum):
+    FLOAT = "float"
+    BASE64_FLOAT32 = "base64-float32"
+    BASE64_FLOAT16 = "base64-float16"
+
+
+_dtypes = {
+    EmbeddingEncoding.BASE64_FLOAT32: np.dtype("<f4"),
+    EmbeddingEncoding.BASE64_FLOAT16: np.dtype("<f2"),
+}
+
+
+def decode_embedding(value, encoding: str = EmbeddingEncoding.FLOAT) -> np.ndarray:
+    """
+    Turn an embedding received from the services container back into an array.
+
+    Base64 payloads are viewed in place with ``numpy.frombuffer`` rather than
+    parsed float by float.
+    """
+    encoding = EmbeddingEncoding(encoding)
+    if encoding == EmbeddingEncoding.FLOAT:
+        return np.asarray(value, dtype=np.float32)
+    return np.frombuffer(base64.b64decode(value), dtype=_dtypes[encoding])
@@ -1,11 +1,13 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Union
 from enum import Enum
 
+from .encoding import EmbeddingEncoding
+
 
 class Modality(Enum):
-    # VIDEO = "video"
-    # IMAGE = "image"
+    VIDEO = "video"
+    IMAGE = "image"
     # AUDIO = "audio"
     TEXT = "text"
 
@@ -16,6 +18,17 @@ class Models(str, Enum):
     JINA = "jinaai/jina-embeddings-v2-base-en"
     # NOMIC_2 = "nomic-ai/nomic-embed-text-v1.5"
     GOOGLE_BERT = "google-bert/bert-base-multilingual-uncased"
+    CLIP = "openai/clip-vit-base-patch32"
+
+
+class LongInputStrategy(str, Enum):
+    TRUNCATE = "truncate"
+    WINDOW = "window"
+
+
+class WindowPooling(str, Enum):
+    MEAN = "mean"
+    WEIGHTED = "weighted"
 
 
 class ConfigsRequest(BaseModel):
@@ -23,7 +36,8 @@ class ConfigsRequest(BaseModel):
         default="text", description="The modality of the input data."
     )
     model: Optional[Models] = Field(
-        default=Models.MINILM, description="The model to be used for processing."
+        default=None,
+        description="The model to be used for processing. Defaults to all-MiniLM-L6-v2 for text and clip-vit-base-patch32 for image and video.",
     )
 
 
@@ -36,20 +50,86 @@ class ConfigsResponse(BaseModel):
 
 
 class EmbeddingRequest(BaseModel):
-    input: str = Field(..., description="The input data to be processed.")
+    input: str = Field(
+        ...,
+        description="The input data to be processed. For image and video this is the URL of the file.",
+    )
     modality: Optional[Modality] = Field(
         default="text", description="The modality of the input data."
     )
     model: Optional[str] = Field(
-        default="sentence-transformers/all-MiniLM-L6-v2",
-        description="The model to be used for processing.",
+        default=None,
+        description="The model to be used for processing. Defaults to all-MiniLM-L6-v2 for text and clip-vit-base-patch32 for image and video.",
+    )
+    long_input: Optional[LongInputStrategy] = Field(
+        default=LongInputStrategy.TRUNCATE,
+        description="How to handle inputs longer than the model's token limit. 'truncate' drops the overflow, 'window' embeds overlapping windows and pools them into one vector.",
+    )
+    window_overlap: Optional[int] = Field(
+        default=64,
+        description="Number of tokens shared by consecutive windows when long_input is 'window'.",
+    )
+    window_pooling: Optional[WindowPooling] = Field(
+        default=WindowPooling.MEAN,
+        description="How window vectors are combined. 'weighted' weights each window by its token count.",
+    )
+    encoding: Optional[EmbeddingEncoding] = Field(
+        default=EmbeddingEncoding.FLOAT,
+        description="How embeddings are returned. 'float' is a list of numbers, 'base64-float32' and 'base64-float16' are base64 strings of little-endian packed floats.",
     )
 
 
 class EmbeddingResponse(BaseModel):
-    embedding: List[float] = Field(
+    embedding: Union[List[float], str] = Field(
         ..., description="The embedding of the processed data."
     )
+    windows: Optional[int] = Field(
+        default=None,
+        description="Number of windows embedded when long_input is 'window'.",
+    )
+    elapsed_time: Optional[float] = Field(
+        default=None, description="The time taken to process the data."
+    )
+
+
+class BatchEmbeddingRequest(BaseModel):
+    input: List[str] = Field(
+        ...,
+        description="The list of inputs to be processed. For image and video these are file URLs.",
+    )
+    modality: Optional[Modality] = Field(
+        default="text", description="The modality of the input data."
+    )
+    model: Optional[str] = Field(
+        default=None,
+        description="The model to be used for processing. Defaults to all-MiniLM-L6-v2 for text and clip-vit-base-patch32 for image and video.",
+    )
+    long_input: Optional[LongInputStrategy] = Field(
+        default=LongInputStrategy.TRUNCATE,
+        description="How to handle inputs longer than the model's token limit. 'truncate' drops the overflow, 'window' embeds overlapping windows and pools them into one vector.",
+    )
+    window_overlap: Optional[int] = Field(
+        default=64,
+        description="Number of tokens shared by consecutive windows when long_input is 'window'.",
+    )
+    window_pooling: Optional[WindowPooling] = Field(
+        default=WindowPooling.MEAN,
+        description="How window vectors are combined. 'weighted' weights each window by its token count.",
+    )
+    encoding: Optional[EmbeddingEncoding] = Field(
+        default=EmbeddingEncoding.FLOAT,
+        description="How embeddings are returned. 'float' is a list of numbers, 'base64-float32' and 'base64-float16' are base64 strings of little-endian packed floats.",
+    )
+
+
+class BatchEmbeddingResponse(BaseModel):
+    embeddings: List[Union[List[float], str]] = Field(
+        ..., description="The embeddings of the processed data, in input order."
+    )
+    windows: Optional[List[int]] = Field(
+        default=None,
+        description="Number of windows embedded per input when long_input is 'window'.",
+    )
     elapsed_time: Optional[float] = Field(
         default=None, description="The time taken to process the data."
     )
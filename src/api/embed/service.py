@@ -1,13 +1,18 @@
+import asyncio
 import httpx
 import json
 import time
 
-from config import services_url
+from config import services_url, embed_stream_batch_size
 
 from _exceptions import InternalServerError, NotFoundError, BadRequestError
 from utilities.methods import _send_post_request
 
-from .model import EmbeddingRequest, ConfigsRequest
+from .encoding import EmbeddingEncoding
+from .model import EmbeddingRequest, BatchEmbeddingRequest, ConfigsRequest, Modality
+
+# (modality, model) -> services config response
+_configs_cache = {}
 
 
 class EmbeddingHandler:
@@ -15,8 +20,8 @@ class EmbeddingHandler:
         pass
 
     async def encode(self, data: EmbeddingRequest):
-        url = f"{services_url}/embed/{data.modality}"
-        payload = {"model": data.model, **data.model_dump()}
+        url = f"{services_url}/embed/{Modality(data.modality).value}"
+        payload = data.model_dump(mode="json")
         try:
             start_time = time.time() * 1000
             resp = await _send_post_request(url, json.dumps(payload))
@@ -25,22 +30,101 @@ class EmbeddingHandler:
         except Exception as e:
             raise InternalServerError(error={"message": str(e)})
 
-    async def get_configs(self, data: ConfigsRequest):
-        """
-        accepts
-            modality: Optional[Modality] = "text"
-            model: Optional[str] = "sentence-transformers/all-MiniLM-L6-v2"
-        """
-        url = f"{services_url}/embed/{data.modality}/config"
-        payload = {"model": data.model, "modality": data.modality}
+    async def encode_batch(self, data: BatchEmbeddingRequest):
+        url = f"{services_url}/embed/{Modality(data.modality).value}/batch"
+        payload = data.model_dump(mode="json")
         try:
             start_time = time.time() * 1000
             resp = await _send_post_request(url, json.dumps(payload))
             resp["elapsed_time"] = time.time() * 1000 - start_time
             return resp
         except Exception as e:
-            raise InternalServerError(
-                error={
-                    "message": "There was an error with the request, reach out to support"
-                }
-            )
+            raise InternalServerError(error={"message": str(e)})
+
+    async def encode_stream(self, lines, modality, model=None, encoding="float"):
+        """
+        Embed an NDJSON stream of inputs, yielding one {index, embedding} line each.
+
+        Inputs are sent to the services batch endpoint embed_stream_batch_size at
+        a time, and the next batch is read while the previous one is embedded, so
+        at most two batches are held however long the stream is. Errors after the
+        response has started are reported as a final {"error": ...} line.
+        """
+        url = f"{services_url}/embed/{Modality(modality).value}/batch"
+        params = {
+            "modality": Modality(modality).value,
+            "model": model,
+            "encoding": EmbeddingEncoding(encoding).value,
+        }
+
+        async def send(inputs):
+            payload = {**params, "input": inputs}
+            resp = await _send_post_request(url, json.dumps(payload))
+            return resp["embeddings"]
+
+        def records(start, embeddings):
+            for offset, embedding in enumerate(embeddings):
+                yield json.dumps({"index": start + offset, "embedding": embedding})
+                yield "\n"
+
+        pending = None
+        batch = []
+        index = 0
+        try:
+            async for line in lines:
+                text = line.get("input") if isinstance(line, dict) else line
+                if not isinstance(text, str):
+                    raise BadRequestError(
+                        error={"message": f"Line {index + len(batch)} has no input"}
+                    )
+                batch.append(text)
+                if len(batch) < embed_stream_batch_size:
+                    continue
+                if pending is not None:
+                    for record in records(pending[0], await pending[1]):
+                        yield record
+                pending = (index, asyncio.create_task(send(batch)))
+                index += len(batch)
+                batch = []
+
+            if pending is not None:
+                for record in records(pending[0], await pending[1]):
+                    yield record
+                pending = None
+            if batch:
+                for record in records(index, await send(batch)):
+                    yield record
+        except (BadRequestError, InternalServerError) as e:
+            yield json.dumps({"error": e.error}) + "\n"
+        except json.JSONDecodeError as e:
+            yield json.dumps({"error": {"message": f"Invalid NDJSON: {e}"}}) + "\n"
+        finally:
+            if pending is not None:
+                pending[1].cancel()
+
+    async def get_configs(self, data: ConfigsRequest):
+        """
+        accepts
+            modality: Optional[Modality] = "text"
+            model: Optional[str] = "sentence-transformers/all-MiniLM-L6-v2"
+
+        configs never change for a given model so they are cached per process
+        """
+        start_time = time.time() * 1000
+        key = (Modality(data.modality).value, data.model)
+        if key not in _configs_cache:
+            url = f"{services_url}/embed/{Modality(data.modality).value}/config"
+            payload = data.model_dump(mode="json")
+            try:
+                resp = await _send_post_request(url, json.dumps(payload))
+            except Exception as e:
+                raise InternalServerError(
+                    error={
+                        "message": "There was an error with the request, reach out to support"
+                    }
+                )
+            _configs_cache[key] = resp
+        return {
+            **_configs_cache[key],
+            "elapsed_time": time.time() * 1000 - start_time,
+        }
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 from rate_limiter import limiter
 from _exceptions import route_exception_handler
 
@@ -25,3 +26,24 @@ async def extract(
 ):
     extract_handler = ExtractHandler()
     return await extract_handler.parse(extract_request)
+
+
+# mixpeek.extract_stream
+@router.post(
+    "/stream",
+    response_class=StreamingResponse,
+    openapi_extra={"x-fern-sdk-method-name": "extract_stream"},
+)
+@route_exception_handler
+async def extract_stream(
+    request: Request,
+    extract_request: ExtractRequest,
+):
+    """
+    Extract a file, reading NDJSON lines back as it is parsed: one
+    {"output": ...} line per chunk, then a final {"metadata": ...} line, or an
+    {"error": ...} line if parsing fails partway.
+    """
+    extract_handler = ExtractHandler()
+    body = await extract_handler.parse_stream(extract_request)
+    return StreamingResponse(body, media_type="application/x-ndjson")
@@ -75,6 +75,11 @@ class AudioParams(BaseModel):
         default=5,
         description="The range of time in seconds to split the audio into chunks.",
     )
+    batch_size: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="The number of chunks transcribed together, defaults to the server setting.",
+    )
 
 
 class ImageParams(BaseModel):
@@ -81,7 +81,7 @@ class ExtractHandler:
             error={"message": f"Content type {content_type} not recognized"}
         )
 
-    async def parse(self, parser_request: ExtractRequest):
+    async def _get_parse_url(self, parser_request: ExtractRequest):
         # if there is no file_url then modality is automatically text
         if parser_request.file_url:
             content_type = await self._get_file_type(parser_request.file_url)
@@ -89,8 +89,10 @@ class ExtractHandler:
             content_type = "text/plain"
 
         modality = self._get_modality(content_type.lower())
+        return f"{services_url}/parse/{modality}"
 
-        url = f"{services_url}/parse/{modality}"
+    async def parse(self, parser_request: ExtractRequest):
+        url = await self._get_parse_url(parser_request)
         data = json.dumps(parser_request.model_dump())
 
         try:
@@ -104,3 +106,45 @@ class ExtractHandler:
                     "message": "There was an error with the request, reach out to support"
                 }
             )
+
+    async def parse_stream(self, parser_request: ExtractRequest):
+        """
+        Start the services streaming parse and return its NDJSON body as an
+        async iterator of raw bytes, passed through as it arrives.
+
+        Errors before the services response starts are raised here; later ones
+        arrive as an {"error": ...} line in the stream itself.
+        """
+        url = await self._get_parse_url(parser_request) + "/stream"
+        data = json.dumps(parser_request.model_dump())
+
+        # the timeout applies between chunks rather than to the whole parse
+        client = httpx.AsyncClient(timeout=180)
+        try:
+            request = client.build_request("POST", url, content=data)
+            response = await client.send(request, stream=True)
+        except Exception:
+            await client.aclose()
+            raise InternalServerError(
+                error={
+                    "message": "There was an error with the request, reach out to support"
+                }
+            )
+        if response.status_code != 200:
+            await response.aclose()
+            await client.aclose()
+            raise InternalServerError(
+                error={
+                    "message": "There was an error with the request, reach out to support"
+                }
+            )
+
+        async def body():
+            try:
+                async for chunk in response.aiter_raw():
+                    yield chunk
+            finally:
+                await response.aclose()
+                await client.aclose()
+
+        return body()
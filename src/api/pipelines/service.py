@@ -9,11 +9,15 @@ from .model import Pipeline, SourceDestinationMapping
 
 from extract.service import ExtractHandler
 from extract.model import ExtractRequest
-from embed.model import EmbeddingRequest
+from embed.model import BatchEmbeddingRequest
+from embed.encoding import EmbeddingEncoding, decode_embedding
 
 from embed.service import EmbeddingHandler
 from storage.service import StorageHandler
 
+# number of chunks sent to the services embed endpoint per request
+EMBED_BATCH_SIZE = 64
+
 
 async def process_orchestrator(
     index_id: str, task_id: str, pipeline: dict, payload: dict
@@ -120,26 +124,32 @@ class PipelineProcessor:
         # TODO: add support for other modalities
         embed_handler = EmbeddingHandler()
 
-        # iterate over each chunk and embed the text
-        for chunk in chunks:
+        # embed the chunks in batches, one round trip per batch
+        for start in range(0, len(chunks), EMBED_BATCH_SIZE):
+            batch = chunks[start : start + EMBED_BATCH_SIZE]
 
             try:
-                embedding_response = await embed_handler.encode(
-                    EmbeddingRequest(input=chunk["text"], model=embedding_model)
+                embedding_response = await embed_handler.encode_batch(
+                    BatchEmbeddingRequest(
+                        input=[chunk["text"] for chunk in batch],
+                        model=embedding_model,
+                        encoding=EmbeddingEncoding.BASE64_FLOAT32,
+                    )
                 )
-            except Exception as e:
-                error = InternalServerError({"message": embedding_response["message"]})
-                self.log_error_in_tasks_db(error)
+            except InternalServerError as e:
+                self.log_error_in_tasks_db(e)
                 continue
 
-            embedding = embedding_response["embedding"]
-            obj = {
-                destination["field"]: chunk["text"],
-                destination["embedding"]: embedding,
-                "metadata": chunk["metadata"],
-                "parent_id": parent_id,
-            }
-            await self.insert_into_destination(obj, destination)
+            for chunk, embedding in zip(batch, embedding_response["embeddings"]):
+                obj = {
+                    destination["field"]: chunk["text"],
+                    destination["embedding"]: decode_embedding(
+                        embedding, EmbeddingEncoding.BASE64_FLOAT32
+                    ).tolist(),
+                    "metadata": chunk["metadata"],
+                    "parent_id": parent_id,
+                }
+                await self.insert_into_destination(obj, destination)
 
     async def process(self, payload):
         # connect to the DB defined in the pipeline configuration
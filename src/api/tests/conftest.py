@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the api modules import each other from the app directory, as under uvicorn
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,30 @@
+import base64
+
+import numpy as np
+import pytest
+
+from embed.encoding import decode_embedding
+
+VECTOR = np.array([0.5, -1.25, 3.0, 1e-3], dtype=np.float32)
+
+
+def test_float_list_decodes_to_float32():
+    decoded = decode_embedding(VECTOR.tolist())
+    assert decoded.dtype == np.float32
+    np.testing.assert_array_equal(decoded, VECTOR)
+
+
+@pytest.mark.parametrize(
+    "encoding, dtype", [("base64-float32", "<f4"), ("base64-float16", "<f2")]
+)
+def test_base64_round_trips(encoding, dtype):
+    # packed the way the services container sends it
+    packed = base64.b64encode(VECTOR.astype(dtype).tobytes()).decode("ascii")
+    np.testing.assert_array_equal(
+        decode_embedding(packed, encoding), VECTOR.astype(dtype)
+    )
+
+
+def test_unknown_encoding_is_rejected():
+    with pytest.raises(ValueError):
+        decode_embedding([0.5], "base64-int8")
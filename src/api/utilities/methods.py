@@ -8,7 +8,7 @@ import time
 import pytz
 from bson import ObjectId
 import json
-from starlette.responses import Response
+from starlette.responses import Response, StreamingResponse
 
 
 def generate_uuid(length=36, dashes=True):
@@ -72,3 +72,34 @@ async def _send_post_request(url, data, timeout=None):
         raise InternalServerError(
             error="There was an error with the request, reach out to support"
         )
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Streams newline-delimited JSON while the request body is still being read.
+
+    StreamingResponse watches for a client disconnect by reading from
+    ``receive``, which would swallow request body chunks the body iterator still
+    needs. Here the body iterator owns ``receive``; a disconnect surfaces as
+    ClientDisconnect from ``request.stream()`` instead.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_ndjson(chunks):
+    """Yield one parsed JSON value per non-empty line of an async byte stream."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    if buffer.strip():
+        yield json.loads(buffer)
@@ -66,7 +66,13 @@ class BadRequestError(APIError):
 
 
 class TooManyRequestsError(APIError):
-    def __init__(self, error: Optional[dict] = None, response: Optional[dict] = None):
+    def __init__(
+        self,
+        error: Optional[dict] = None,
+        response: Optional[dict] = None,
+        retry_after: Optional[int] = None,
+    ):
+        self.retry_after = retry_after
         super().__init__(
             success=False,
             status=429,
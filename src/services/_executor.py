@@ -0,0 +1,181 @@
+import asyncio
+import functools
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+import torch
+
+from config import executors as executor_config
+from config import torch_threads_per_worker, retry_after_seconds
+from _exceptions import TooManyRequestsError
+
+
+def _with_torch_threads(fn: Callable[[], Any], num_threads: Optional[int]):
+    # torch.set_num_threads is effectively process-wide (MKL and the intra-op
+    # pool), so it is set at the start of every job rather than once per
+    # worker. With the default every model pool uses the same count; pools
+    # given their own count can still see another pool's while both are busy.
+    if num_threads is None:
+        return fn
+
+    def job():
+        torch.set_num_threads(num_threads)
+        return fn()
+
+    return job
+
+
+# marks the end of a generator run by BoundedExecutor.iterate
+_done = object()
+
+
+class BoundedExecutor:
+    """
+    Runs blocking inference work off the event loop on a dedicated pool.
+
+    At most ``max_workers`` jobs run at once and ``max_queue`` more may wait;
+    anything beyond that is rejected with a 429 so callers back off instead of
+    piling up behind a saturated pool. Jobs set ``intra_op_threads`` torch
+    threads before they run, pools that don't run models leave it as is.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_queue: int,
+        intra_op_threads: Optional[int],
+    ):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.intra_op_threads = intra_op_threads
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def _admit(self):
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                raise TooManyRequestsError(
+                    error={"message": f"The {self.name} queue is full, retry later"},
+                    retry_after=retry_after_seconds,
+                )
+            self._pending += 1
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        self._admit()
+        job = functools.partial(fn, *args, **kwargs)
+        future = self._executor.submit(_with_torch_threads(job, self.intra_op_threads))
+        # released when the job finishes, even if the awaiting request is cancelled
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def iterate(
+        self, fn: Callable[..., Iterator], *args, buffer: int = 8, **kwargs
+    ) -> AsyncIterator:
+        """
+        Run the generator function ``fn`` on the pool and return an async
+        iterator over its items as they are produced.
+
+        The job is admitted here rather than on first iteration, so a full pool
+        raises TooManyRequestsError before the caller has started a response.
+        The worker runs at most ``buffer`` items ahead of the consumer, and
+        closes the generator at its next item once the consumer stops reading.
+        Exceptions raised by ``fn`` are re-raised from the iterator.
+        """
+        self._admit()
+        job = {"submitted": False}
+        iterator = self._iterate(functools.partial(fn, *args, **kwargs), buffer, job)
+        # an iterator dropped before it was started never submits its job
+        weakref.finalize(iterator, self._release_unsubmitted, job)
+        return iterator
+
+    def _release_unsubmitted(self, job: dict):
+        if not job["submitted"]:
+            self._release(None)
+
+    async def _iterate(self, fn: Callable[[], Iterator], buffer: int, job: dict):
+        loop = asyncio.get_running_loop()
+        items = asyncio.Queue()
+        slots = threading.Semaphore(buffer)
+        stopped = threading.Event()
+
+        def produce():
+            generator = fn()
+            try:
+                for item in generator:
+                    slots.acquire()
+                    if stopped.is_set():
+                        return
+                    loop.call_soon_threadsafe(items.put_nowait, (item, None))
+            except BaseException as e:
+                loop.call_soon_threadsafe(items.put_nowait, (_done, e))
+            else:
+                loop.call_soon_threadsafe(items.put_nowait, (_done, None))
+            finally:
+                generator.close()
+
+        job["submitted"] = True
+        future = self._executor.submit(
+            _with_torch_threads(produce, self.intra_op_threads)
+        )
+        future.add_done_callback(self._release)
+        try:
+            while True:
+                item, error = await items.get()
+                if item is _done:
+                    if error is not None:
+                        raise error
+                    return
+                slots.release()
+                yield item
+        finally:
+            stopped.set()
+            # wake the worker if it is waiting for room
+            slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "intra_op_threads": self.intra_op_threads,
+        }
+
+
+def _intra_op_threads(pool: dict) -> Optional[int]:
+    if not pool["runs_models"]:
+        return None
+    if pool["torch_threads"]:
+        return pool["torch_threads"]
+    if torch_threads_per_worker:
+        return torch_threads_per_worker
+    # every model pool can be busy at once, so their workers split one budget
+    # of cores; parse_text and parse_partition don't run torch and get no share
+    workers = sum(
+        other["max_workers"]
+        for other in executor_config.values()
+        if other["runs_models"]
+    )
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+executors = {
+    name: BoundedExecutor(
+        name,
+        max_workers=pool["max_workers"],
+        max_queue=pool["max_queue"],
+        intra_op_threads=_intra_op_threads(pool),
+    )
+    for name, pool in executor_config.items()
+}
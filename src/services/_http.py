@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+import httpx
+
+from config import http as http_config
+
+log = logging.getLogger(__name__)
+
+try:
+    # httpx only speaks HTTP/2 when the optional h2 package is installed
+    import h2  # noqa: F401
+
+    _h2_available = True
+except ImportError:
+    _h2_available = False
+
+
+class HTTPClientPool:
+    """
+    One pooled ``httpx.AsyncClient`` shared by every outbound request.
+
+    Connections are kept alive between requests, so repeated downloads from the
+    same S3 bucket or CDN skip the TCP and TLS handshakes. Concurrent requests to
+    a single host are capped by a per-host semaphore so one slow origin can't
+    take every connection in the pool.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._host_semaphores = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            http2 = http_config["http2"] and _h2_available
+            if http_config["http2"] and not _h2_available:
+                log.info("h2 is not installed, outbound requests use HTTP/1.1")
+            self._client = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=http_config["max_connections"],
+                    max_keepalive_connections=http_config["max_keepalive_connections"],
+                    keepalive_expiry=http_config["keepalive_expiry"],
+                ),
+                timeout=httpx.Timeout(
+                    http_config["read_timeout"],
+                    connect=http_config["connect_timeout"],
+                ),
+            )
+        return self._client
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(str(url)).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(
+                http_config["max_connections_per_host"]
+            )
+        return self._host_semaphores[host]
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        async with self._host_semaphore(url):
+            return await self.client.request(method, url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs):
+        async with self._host_semaphore(url):
+            async with self.client.stream(method, url, **kwargs) as response:
+                yield response
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+http_pool = HTTPClientPool()
@@ -0,0 +1,169 @@
+import gc
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Hashable
+
+import torch
+
+log = logging.getLogger(__name__)
+
+
+def estimate_nbytes(obj: Any) -> int:
+    """
+    Estimate the resident size of a loaded model object.
+
+    Objects can report their own size through a ``memory_footprint()`` method,
+    otherwise the parameters and buffers of every torch module attribute are summed.
+    """
+    if hasattr(obj, "memory_footprint"):
+        return int(obj.memory_footprint())
+
+    modules = [obj] if isinstance(obj, torch.nn.Module) else vars(obj).values()
+    total = 0
+    for value in modules:
+        if isinstance(value, torch.nn.Module):
+            total += sum(p.numel() * p.element_size() for p in value.parameters())
+            total += sum(b.numel() * b.element_size() for b in value.buffers())
+    return total
+
+
+def _key_name(key: Hashable) -> str:
+    return ":".join(map(str, key)) if isinstance(key, tuple) else str(key)
+
+
+class _Entry:
+    def __init__(self, obj: Any, nbytes: int, load_seconds: float):
+        self.obj = obj
+        self.nbytes = nbytes
+        self.load_seconds = load_seconds
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models.
+
+    Each model is loaded once and kept resident. When the summed size of the
+    resident models exceeds ``memory_budget_mb`` the least recently used ones are
+    evicted. Loads of the same key are serialized so concurrent callers never
+    trigger a second ``from_pretrained``.
+    """
+
+    def __init__(self, name: str, memory_budget_mb: int):
+        self.name = name
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: dict = {}
+        # keys currently being loaded and the last load error per key
+        self._loading: set = set()
+        self._failed: dict = {}
+        # per key, survives eviction so reloads show up as loads > 1
+        self._hits = Counter()
+        self._loads = Counter()
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry.obj
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # another caller may have finished loading while we waited
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    return entry.obj
+
+            with self._lock:
+                self._loading.add(key)
+            start_time = time.perf_counter()
+            try:
+                obj = loader()
+            except Exception as e:
+                with self._lock:
+                    self._failed[key] = str(e)
+                raise
+            finally:
+                with self._lock:
+                    self._loading.discard(key)
+            entry = _Entry(obj, estimate_nbytes(obj), time.perf_counter() - start_time)
+            log.info(
+                "%s registry loaded %s in %.2fs (%.1f MB)",
+                self.name,
+                key,
+                entry.load_seconds,
+                entry.nbytes / 1024 / 1024,
+            )
+
+            with self._lock:
+                self._entries[key] = entry
+                self._loads[key] += 1
+                self._failed.pop(key, None)
+                self._evict(keep=key)
+            return obj
+
+    def _lookup(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self._hits[key] += 1
+        return entry
+
+    def _evict(self, keep: Hashable):
+        evicted = False
+        while self.resident_bytes > self.memory_budget and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            entry = self._entries.pop(key)
+            evicted = True
+            log.info(
+                "%s registry evicted %s (%.1f MB)",
+                self.name,
+                key,
+                entry.nbytes / 1024 / 1024,
+            )
+        if evicted:
+            gc.collect()
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def stats(self) -> dict:
+        with self._lock:
+            models = {
+                _key_name(key): {
+                    "state": "ready",
+                    "load_seconds": round(entry.load_seconds, 3),
+                    "bytes": entry.nbytes,
+                    "loads": self._loads[key],
+                    "hits": self._hits[key],
+                }
+                for key, entry in self._entries.items()
+            }
+            models.update(
+                {_key_name(key): {"state": "loading"} for key in self._loading}
+            )
+            models.update(
+                {
+                    _key_name(key): {"state": "failed", "error": error}
+                    for key, error in self._failed.items()
+                    if key not in self._loading
+                }
+            )
+            return {
+                "memory_budget_bytes": self.memory_budget,
+                "resident_bytes": self.resident_bytes,
+                "loads": sum(self._loads.values()),
+                "hits": sum(self._hits.values()),
+                "models": models,
+            }
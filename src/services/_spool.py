@@ -0,0 +1,106 @@
+import mmap
+import tempfile
+from contextlib import contextmanager
+from io import BytesIO
+
+
+class SpooledFile:
+    """
+    Binary file that stays in memory up to ``max_memory`` bytes and then rolls
+    over to a named temporary file on disk.
+
+    It reads like a regular file object, so parsers can consume it directly.
+    ``view()`` exposes the contents without copying them (the in-memory buffer
+    or a read-only mmap of the file on disk) and ``path`` gives tools that need
+    a filename, such as OpenCV or ffmpeg, the file on disk.
+    """
+
+    def __init__(self, max_memory: int, suffix: str = "", dir: str = None):
+        self.max_memory = max_memory
+        self.suffix = suffix
+        self.dir = dir
+        self.size = 0
+        self._file = BytesIO()
+
+    @property
+    def on_disk(self) -> bool:
+        return not isinstance(self._file, BytesIO)
+
+    def _rollover(self):
+        file = tempfile.NamedTemporaryFile(suffix=self.suffix, dir=self.dir)
+        position = self._file.tell()
+        file.write(self._file.getbuffer())
+        file.seek(position)
+        self._file.close()
+        self._file = file
+
+    def write(self, data) -> int:
+        if not self.on_disk and self.size + len(data) > self.max_memory:
+            self._rollover()
+        written = self._file.write(data)
+        self.size = max(self.size, self._file.tell())
+        return written
+
+    @property
+    def path(self) -> str:
+        """Path of the contents on disk, rolling over first if still in memory."""
+        if not self.on_disk:
+            self._rollover()
+        self._file.flush()
+        return self._file.name
+
+    @contextmanager
+    def view(self):
+        """Read-only memoryview of the contents, valid inside the ``with`` block."""
+        if not self.on_disk:
+            with self._file.getbuffer() as buffer, buffer.toreadonly() as view:
+                yield view
+            return
+
+        self._file.flush()
+        if not self.size:
+            # empty files can't be mapped
+            yield memoryview(b"")
+            return
+        with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                yield view
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return True
+
+    def close(self):
+        # the temporary file is deleted on close
+        self._file.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def __getattr__(self, name):
+        # readline, readinto, fileno, ... of the underlying file
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
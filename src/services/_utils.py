@@ -1,13 +1,19 @@
 from fastapi.responses import JSONResponse
 from typing import Optional
-import psutil
-from functools import wraps
+import httpx
 
-from _exceptions import TooManyRequestsError
+from config import downloads as download_config
+from _exceptions import BadRequestError
+from _http import http_pool
+from _spool import SpooledFile
 
 
 def create_json_response(
-    success: bool, status: int, error: str, response: Optional[str]
+    success: bool,
+    status: int,
+    error: str,
+    response: Optional[str],
+    headers: Optional[dict] = None,
 ):
     return JSONResponse(
         content={
@@ -17,6 +23,7 @@ def create_json_response(
             "response": response,
         },
         status_code=status,
+        headers=headers,
     )
 
 
@@ -24,12 +31,40 @@ def create_success_response(response: Optional[str]):
     return create_json_response(True, 200, "", response)
 
 
-def check_cpu_usage(func):
-    @wraps(func)
-    async def wrapper(*args, **kwargs):
-        cpu_usage = psutil.cpu_percent()
-        if cpu_usage > 90:
-            raise TooManyRequestsError()
-        return await func(*args, **kwargs)
+def new_spooled_file(suffix: str = "") -> SpooledFile:
+    return SpooledFile(
+        max_memory=download_config["memory_threshold_mb"] * 1024 * 1024,
+        suffix=suffix,
+        dir=download_config["tmp_dir"],
+    )
+
+
+async def download_file(url: str, suffix: str = ""):
+    """
+    Stream ``url`` into a SpooledFile and return it with the response headers.
+
+    The download is aborted as soon as it is known to exceed the size limit,
+    from the content-length header when the server sends one.
+    """
+    max_size = download_config["max_size_mb"] * 1024 * 1024
+    too_large = {"message": f"File exceeds {download_config['max_size_mb']}MB"}
+    spool = new_spooled_file(suffix)
+    try:
+        async with http_pool.stream("GET", url) as response:
+            if response.status_code != 200:
+                raise BadRequestError(error={"message": "Error downloading file"})
+            if int(response.headers.get("content-length", 0)) > max_size:
+                raise BadRequestError(error=too_large)
+            async for chunk in response.aiter_bytes(download_config["chunk_size"]):
+                if spool.size + len(chunk) > max_size:
+                    raise BadRequestError(error=too_large)
+                spool.write(chunk)
+    except (httpx.HTTPError, httpx.InvalidURL):
+        spool.close()
+        raise BadRequestError(error={"message": "Error downloading file"})
+    except BaseException:
+        spool.close()
+        raise
 
-    return wrapper
+    spool.seek(0)
+    return spool, response.headers
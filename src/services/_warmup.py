@@ -0,0 +1,89 @@
+import logging
+import os
+import signal
+import threading
+import time
+from typing import Callable, Dict, List
+
+import psutil
+
+from config import warmup as warmup_config
+from _registry import ModelRegistry
+
+log = logging.getLogger(__name__)
+
+
+class Warmup:
+    """
+    Loads and warms the configured models in the background at startup.
+
+    Each task loads one model and runs a dummy forward pass through it, so the
+    first real request doesn't pay for ``from_pretrained`` or lazy kernel
+    initialization. The process only reports ready once every task succeeded.
+
+    Failed tasks are retried with exponential backoff. A task that still fails
+    after ``attempts`` tries shuts the process down, so that it is restarted
+    instead of staying up without ever becoming ready.
+    """
+
+    def __init__(self):
+        self.tasks: Dict[str, dict] = {}
+        self.registries: List[ModelRegistry] = []
+        self._thread = None
+
+    def start(
+        self, tasks: Dict[str, Callable[[], None]], registries: List[ModelRegistry]
+    ):
+        self.registries = registries
+        self.tasks = {name: {"state": "pending"} for name in tasks}
+        self._thread = threading.Thread(
+            target=self._run, args=(tasks,), name="warmup", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, tasks: Dict[str, Callable[[], None]]):
+        for name, task in tasks.items():
+            if not self._warm(name, task):
+                log.critical("warmup of %s keeps failing, shutting down", name)
+                # the same graceful shutdown as a stop from the orchestrator
+                os.kill(os.getpid(), signal.SIGTERM)
+                return
+
+    def _warm(self, name: str, task: Callable[[], None]) -> bool:
+        backoff = warmup_config["backoff_seconds"]
+        for attempt in range(1, warmup_config["attempts"] + 1):
+            self.tasks[name] = {"state": "warming", "attempt": attempt}
+            start_time = time.perf_counter()
+            try:
+                task()
+            except Exception as e:
+                log.exception("warmup of %s failed (attempt %s)", name, attempt)
+                self.tasks[name] = {
+                    "state": "failed",
+                    "attempt": attempt,
+                    "error": str(e),
+                }
+                if attempt < warmup_config["attempts"]:
+                    time.sleep(backoff)
+                    backoff *= 2
+                continue
+            seconds = time.perf_counter() - start_time
+            log.info("warmed up %s in %.2fs", name, seconds)
+            self.tasks[name] = {"state": "warm", "seconds": round(seconds, 3)}
+            return True
+        return False
+
+    @property
+    def ready(self) -> bool:
+        return all(task["state"] == "warm" for task in self.tasks.values())
+
+    def report(self) -> dict:
+        return {
+            "ready": self.ready,
+            "warmup": self.tasks,
+            "models": {registry.name: registry.stats() for registry in self.registries},
+            "rss_bytes": psutil.Process().memory_info().rss,
+        }
+
+
+warmup = Warmup()
@@ -12,6 +12,9 @@ from parse.controller import router as parse_router
 from package.controller import router as package_router
 from website.controller import router as website_router
 
+from _utils import create_json_response
+from _warmup import warmup
+
 api_router = APIRouter()
 
 
@@ -44,3 +47,10 @@ api_router.include_router(website_router, prefix="/website", tags=["Websites"])
 @api_router.get("/healthcheck", include_in_schema=False)
 def healthcheck():
     return {"status": "ok"}
+
+
+@api_router.get("/readiness", include_in_schema=False)
+def readiness():
+    if warmup.ready:
+        return create_json_response(True, 200, "", warmup.report())
+    return create_json_response(False, 503, "Models are warming up", warmup.report())
@@ -0,0 +1,86 @@
+"""
+Compares text embedding throughput with and without length bucketing.
+
+Run from src/services:
+
+    python -m benchmarks.bucketing --model sentence-transformers/all-MiniLM-L6-v2
+"""
+
+import argparse
+import random
+import time
+
+from embed.text.service import TextEmbeddingService
+
+WORDS = (
+    "the contract shall terminate upon written notice by either party revenue "
+    "increased quarter over quarter driven by subscription growth in europe and "
+    "table figure section appendix total net income operating expenses summary"
+).split()
+
+
+def make_chunks(count, seed=0):
+    # parsed documents are mostly short elements (titles, cells, list items) with
+    # a long tail of full paragraphs that run into the model's token limit
+    rng = random.Random(seed)
+    lengths = [
+        min(450, max(3, int(rng.lognormvariate(3.2, 1.1)))) for _ in range(count)
+    ]
+    return [" ".join(rng.choice(WORDS) for _ in range(n)) for n in lengths]
+
+
+def padded_tokens(lengths, batch_size, bucket_size=None):
+    total = 0
+    for start in range(0, len(lengths), batch_size):
+        batch = lengths[start : start + batch_size]
+        if bucket_size:
+            batch = sorted(batch)
+            groups = [
+                batch[i : i + bucket_size] for i in range(0, len(batch), bucket_size)
+            ]
+        else:
+            groups = [batch]
+        total += sum(len(group) * max(group) for group in groups)
+    return total
+
+
+def run(service, chunks, batch_size, bucketed):
+    start_time = time.perf_counter()
+    for start in range(0, len(chunks), batch_size):
+        service._encode(chunks[start : start + batch_size], bucketed=bucketed)
+    return time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--chunks", type=int, default=2048)
+    parser.add_argument("--batch-size", type=int, default=128)
+    args = parser.parse_args()
+
+    service = TextEmbeddingService(args.model)
+    chunks = make_chunks(args.chunks)
+    lengths = [
+        len(ids) for ids in service.tokenizer(chunks, truncation=True)["input_ids"]
+    ]
+    real_tokens = sum(lengths)
+
+    # warm up kernels before timing
+    service._encode(chunks[: args.batch_size])
+
+    print(f"{len(chunks)} chunks, {real_tokens} tokens, batch size {args.batch_size}")
+    for label, bucketed, bucket_size in [
+        ("padded", False, None),
+        ("bucketed", True, service.bucket_size),
+    ]:
+        elapsed = run(service, chunks, args.batch_size, bucketed)
+        processed = padded_tokens(lengths, args.batch_size, bucket_size)
+        print(
+            f"{label:>9}: {real_tokens / elapsed:10.0f} tokens/s  "
+            f"{processed} tokens through the model "
+            f"({real_tokens / processed:.0%} useful)  {elapsed:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Compares the seek-based frame sampling loop with the sequential FrameSampler.
+
+Run from src/services, optionally against a real video:
+
+    python -m benchmarks.frame_sampler --video path/to/video.mp4 --fps 1
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from embed.video.sampler import FrameSampler
+
+
+def make_video(path, seconds, fps=30, width=1280, height=720):
+    writer = cv2.VideoWriter(
+        path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height)
+    )
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    for i in range(seconds * fps):
+        # shift the noise so consecutive frames differ and inter-frame coding works
+        writer.write(np.roll(frame, i * 8, axis=1))
+    writer.release()
+
+
+def seek_sampling(video_path, fps):
+    # the loop CLIPEmbedder.get_video_embedding used before FrameSampler
+    cap = cv2.VideoCapture(video_path)
+    video_fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    frame_indices = [
+        int(video_fps / fps * i) for i in range(int(frame_count / video_fps * fps))
+    ]
+    sampled = 0
+    for index in frame_indices:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        success, frame = cap.read()
+        if not success:
+            break
+        sampled += 1
+    cap.release()
+    return sampled, frame_count
+
+
+def sequential_sampling(video_path, fps):
+    sampler = FrameSampler(video_path, fps=fps)
+    sampled = sum(1 for _ in sampler)
+    return sampled, sampler.decoded
+
+
+def run(sample, video_path, fps):
+    # runs in a fresh process, ru_maxrss is the peak over the process lifetime
+    # so the decoder's share is measured against the peak before sampling
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start_time = time.perf_counter()
+    sampled, frames = sample(video_path, fps)
+    elapsed = time.perf_counter() - start_time
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return sampled, frames, elapsed, peak, peak - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video", default=None)
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--fps", type=float, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        video_path = args.video
+        if video_path is None:
+            video_path = os.path.join(tmp_dir, "synthetic.mp4")
+            make_video(video_path, args.seconds)
+
+        for label, sample in [
+            ("seek", seek_sampling),
+            ("sequential", sequential_sampling),
+        ]:
+            # one process per sampler, so neither inherits the other's peak
+            with ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                sampled, frames, elapsed, peak, growth = executor.submit(
+                    run, sample, video_path, args.fps
+                ).result()
+            print(
+                f"{label:>10}: {frames / elapsed:8.0f} frames/s  "
+                f"{sampled} sampled of {frames}  {elapsed:.2f}s  "
+                f"peak rss {peak / 1024:.0f}MB (+{growth / 1024:.0f}MB while sampling)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Compares the old per-parser chunk post-processing with the shared
+UnstructuredParser stage on a synthetic corpus of partitioned pages.
+
+Run from src/services:
+
+    python -m benchmarks.postprocess --pages 1000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from unstructured.chunking.basic import chunk_elements
+from unstructured.cleaners.core import clean
+from unstructured.documents.elements import (
+    ElementMetadata,
+    ListItem,
+    NarrativeText,
+    Title,
+)
+
+from parse.model import ParseFileRequest
+from parse.text.parsers.base_parser import UnstructuredParser
+
+PARAGRAPH = (
+    "The quarterly  report covers revenue, costs and  outlook for each region —"
+    " including the well-known long-term  contracts signed this year. "
+)
+
+
+def make_corpus(pages):
+    elements = []
+    for page in range(1, pages + 1):
+        metadata = dict(page_number=page, languages=["eng"], filetype="application/pdf")
+        elements.append(Title(f"Section {page}", metadata=ElementMetadata(**metadata)))
+        for _ in range(4):
+            elements.append(
+                NarrativeText(PARAGRAPH * 3, metadata=ElementMetadata(**metadata))
+            )
+        for item in range(3):
+            elements.append(
+                ListItem(f"● point {item}.", metadata=ElementMetadata(**metadata))
+            )
+    return elements
+
+
+def old_postprocess(elements, params):
+    # what every text parser did before the shared stage
+    chunks = chunk_elements(
+        elements=elements,
+        max_characters=params.max_characters_per_chunk,
+    )
+    chunks_dict = [chunk.to_dict() for chunk in chunks]
+
+    if params.clean_text:
+        chunks_dict = [
+            {
+                **c,
+                "text": clean(
+                    text=c["text"],
+                    extra_whitespace=True,
+                    dashes=True,
+                    bullets=True,
+                    trailing_punctuation=True,
+                ),
+            }
+            for c in chunks_dict
+        ]
+
+    if params.should_chunk:
+        return chunks_dict
+    else:
+        return " ".join([c["text"] for c in chunks_dict])
+
+
+def new_postprocess(elements, params):
+    parser = UnstructuredParser.__new__(UnstructuredParser)
+    output = list(parser._postprocess(elements, params))
+    if params.should_chunk:
+        return output
+    else:
+        return " ".join(output)
+
+
+def measure(postprocess, pages, params, repeat=5):
+    # the shared stage cleans elements in place, so each run gets a fresh corpus
+    timings = []
+    for _ in range(repeat):
+        elements = make_corpus(pages)
+        start_time = time.perf_counter()
+        postprocess(elements, params)
+        timings.append(time.perf_counter() - start_time)
+
+    # trace the corpus too, so text replaced in place counts as freed
+    tracemalloc.start()
+    elements = make_corpus(pages)
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    output = postprocess(elements, params)
+    _, peak = tracemalloc.get_traced_memory()
+    del elements
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+    del output
+    return min(timings), peak - baseline, blocks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--max-characters", type=int, default=1500)
+    args = parser.parse_args()
+
+    for should_chunk in [True, False]:
+        params = ParseFileRequest(
+            should_chunk=should_chunk, max_characters_per_chunk=args.max_characters
+        )
+        print(f"should_chunk={should_chunk}, {args.pages} pages")
+        for label, postprocess in [
+            ("old", old_postprocess),
+            ("shared", new_postprocess),
+        ]:
+            elapsed, peak, blocks = measure(postprocess, args.pages, params)
+            print(
+                f"{label:>8}: {args.pages / elapsed:8.0f} pages/s  {elapsed:.2f}s  "
+                f"peak over corpus {peak / 1024 / 1024:5.1f}MB  "
+                f"{blocks} blocks in output"
+            )
+
+
+if __name__ == "__main__":
+    main()
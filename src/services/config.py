@@ -15,3 +15,117 @@ unstructured = {
     "api_key": os.getenv("UNSTRUCTURED_API_KEY"),
     "url": os.getenv("UNSTRUCTURED_URL"),
 }
+
+
+def _csv(value):
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+embed = {
+    # models loaded at startup so the first request is hot
+    "preload_models": _csv(
+        os.getenv("EMBED_PRELOAD_MODELS", "sentence-transformers/all-MiniLM-L6-v2")
+    ),
+    # CLIP models for image and video, warmed at startup as well
+    "preload_media_models": _csv(os.getenv("EMBED_PRELOAD_MEDIA_MODELS")),
+    # LRU eviction kicks in once resident models exceed this budget
+    "memory_budget_mb": int(os.getenv("EMBED_MEMORY_BUDGET_MB", "4096")),
+    # upper bound on inputs accepted by /embed/{modality}/batch
+    "max_batch_size": int(os.getenv("EMBED_MAX_BATCH_SIZE", "128")),
+    # micro-batching of concurrent single-input requests
+    "batch_wait_ms": float(os.getenv("EMBED_BATCH_WAIT_MS", "5")),
+    "batch_max_size": int(os.getenv("EMBED_BATCH_MAX_SIZE", "32")),
+    # embedding cache, the sqlite tier is only enabled when a path is set
+    "cache_entries": int(os.getenv("EMBED_CACHE_ENTRIES", "50000")),
+    "cache_path": os.getenv("EMBED_CACHE_PATH"),
+    # inputs are sorted by token length and encoded in buckets of this size
+    "bucket_size": int(os.getenv("EMBED_BUCKET_SIZE", "16")),
+    # text backend: torch, onnx or onnx-int8 (dynamic int8 quantization)
+    "backend": os.getenv("EMBED_BACKEND", "torch"),
+    "onnx_cache_dir": os.getenv("EMBED_ONNX_CACHE_DIR", "/tmp/mixpeek/onnx"),
+    # exported models below this cosine similarity to torch are rejected
+    "onnx_min_similarity": float(os.getenv("EMBED_ONNX_MIN_SIMILARITY", "0.99")),
+    # image and video embeddings
+    "frame_batch_size": int(os.getenv("EMBED_FRAME_BATCH_SIZE", "32")),
+    "video_fps": float(os.getenv("EMBED_VIDEO_FPS", "1")),
+}
+
+parse = {
+    # audio, image, video, keyphrase, summarizer or partition, warmed at startup
+    "preload_models": _csv(os.getenv("PARSE_PRELOAD_MODELS")),
+    # LRU eviction kicks in once resident parse models exceed this budget
+    "memory_budget_mb": int(os.getenv("PARSE_MEMORY_BUDGET_MB", "4096")),
+    # parse results keyed by file sha256 and settings, empty disables the cache
+    "cache_dir": os.getenv("PARSE_CACHE_DIR", "/tmp/mixpeek/parse-cache"),
+    "cache_max_mb": int(os.getenv("PARSE_CACHE_MAX_MB", "1024")),
+    # partitioning jobs running longer than this are killed with their worker
+    "partition_timeout": float(os.getenv("PARSE_PARTITION_TIMEOUT", "600")),
+    # PDFs with at least this many pages are split into page ranges that are
+    # partitioned concurrently by up to pdf_split_workers worker processes
+    "pdf_split_threshold": int(os.getenv("PARSE_PDF_SPLIT_THRESHOLD", "16")),
+    "pdf_split_workers": int(os.getenv("PARSE_PDF_SPLIT_WORKERS", "2")),
+    # streamed PDFs are partitioned in batches of this many pages, whatever
+    # their size, so the first chunks don't wait for half the document
+    "pdf_stream_pages": int(os.getenv("PARSE_PDF_STREAM_PAGES", "4")),
+    # audio segments transcribed per generate call unless audio_settings.batch_size
+    "asr_batch_size": int(os.getenv("PARSE_ASR_BATCH_SIZE", "8")),
+    # audio is decoded by piping it through this binary
+    "ffmpeg_path": os.getenv("FFMPEG_PATH", "ffmpeg"),
+}
+
+downloads = {
+    # downloads larger than this are aborted, checked against content-length first
+    "max_size_mb": int(os.getenv("DOWNLOAD_MAX_SIZE_MB", "2048")),
+    # files stay in memory up to this size and are spooled to disk beyond it
+    "memory_threshold_mb": int(os.getenv("DOWNLOAD_MEMORY_THRESHOLD_MB", "32")),
+    "tmp_dir": os.getenv("DOWNLOAD_TMP_DIR"),
+    "chunk_size": int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(1024 * 1024))),
+}
+
+# startup model warmup, see _warmup.py
+warmup = {
+    # a task failing this many times shuts the process down so it is restarted
+    "attempts": int(os.getenv("WARMUP_ATTEMPTS", "3")),
+    # doubled after every failed attempt
+    "backoff_seconds": float(os.getenv("WARMUP_BACKOFF_SECONDS", "5")),
+}
+
+# shared outbound http client, see _http.py
+http = {
+    "max_connections": int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+    "max_keepalive_connections": int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+    "keepalive_expiry": float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+    "max_connections_per_host": int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "16")),
+    "connect_timeout": float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+    "read_timeout": float(os.getenv("HTTP_READ_TIMEOUT", "60")),
+    # only used when the h2 package is installed
+    "http2": os.getenv("HTTP2", "true").lower() == "true",
+}
+
+
+def _pool(name, workers, queue_size, runs_models=True):
+    return {
+        "max_workers": int(os.getenv(f"{name}_WORKERS", workers)),
+        "max_queue": int(os.getenv(f"{name}_QUEUE_SIZE", queue_size)),
+        # pools that run torch models share the cores between their workers
+        "runs_models": runs_models,
+        # torch intra-op threads per worker of this pool, 0 for the default
+        "torch_threads": int(os.getenv(f"{name}_TORCH_THREADS", "0")),
+    }
+
+
+# one bounded pool per model family, requests beyond workers + queue get a 429
+executors = {
+    "embed": _pool("EMBED", "2", "64"),
+    "embed_media": _pool("EMBED_MEDIA", "1", "16"),
+    "parse_text": _pool("PARSE_TEXT", "2", "16", runs_models=False),
+    # threads waiting on the unstructured worker processes, one per process
+    "parse_partition": _pool("PARSE_PARTITION", "2", "16", runs_models=False),
+    "parse_audio": _pool("PARSE_AUDIO", "1", "8"),
+    "parse_image": _pool("PARSE_IMAGE", "1", "16"),
+    "parse_video": _pool("PARSE_VIDEO", "1", "4"),
+}
+# torch intra-op threads per worker of every pool without its own setting,
+# defaults to splitting the cores between the workers of all model pools
+torch_threads_per_worker = int(os.getenv("TORCH_THREADS_PER_WORKER", "0"))
+retry_after_seconds = int(os.getenv("RETRY_AFTER_SECONDS", "1"))
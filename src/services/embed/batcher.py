@@ -0,0 +1,91 @@
+import asyncio
+from collections import Counter
+from typing import Any, Callable, List
+
+from _executor import BoundedExecutor
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-input encode calls into one batched forward pass.
+
+    The first queued request opens a window of ``max_wait_ms``; every request that
+    arrives before it closes (or until ``max_batch_size`` is reached) is encoded
+    together and each caller receives its own row of the result. Batches run on
+    ``executor`` so collection of the next batch continues while one is encoding.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[Any]], List[Any]],
+        executor: BoundedExecutor,
+        max_wait_ms: float,
+        max_batch_size: int,
+    ):
+        self.encode_fn = encode_fn
+        self.executor = executor
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.histogram = Counter()
+        self._queue = None
+        self._worker = None
+        self._inflight = set()
+
+    async def submit(self, item: Any) -> Any:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # callers that disconnected while waiting don't need a forward pass
+        return [(item, future) for item, future in batch if not future.done()]
+
+    async def _dispatch(self, batch):
+        try:
+            results = await self.executor.run(
+                self.encode_fn, [item for item, _ in batch]
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            if not batch:
+                continue
+
+            self.histogram[len(batch)] += 1
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    def stats(self) -> dict:
+        return {
+            "batches": sum(self.histogram.values()),
+            "requests": sum(size * count for size, count in self.histogram.items()),
+            "batch_size_histogram": {
+                str(size): self.histogram[size] for size in sorted(self.histogram)
+            },
+        }
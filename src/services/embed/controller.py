@@ -3,24 +3,54 @@ from fastapi import APIRouter  # Import APIRouter instead of FastAPI
 from .model import (
     EmbeddingRequest,
     EmbeddingResponse,
+    BatchEmbeddingRequest,
+    BatchEmbeddingResponse,
     ConfigsRequest,
     ConfigsResponse,
 )
 
-from embed.service import EmbeddingHandler
+from embed.service import EmbeddingHandler, get_stats
 
 from _exceptions import BadRequestError, InternalServerError, NotFoundError
-from _utils import check_cpu_usage
 
 router = APIRouter()
 
 
+@router.get("/stats")
+async def embed_stats():
+    return get_stats()
+
+
 @router.post("/{modality}", response_model=EmbeddingResponse)
-@check_cpu_usage
 async def embed_input(modality: str, data: EmbeddingRequest):
     embedding_handler = EmbeddingHandler(modality, data.model)
     try:
-        return embedding_handler.encode(data.input)
+        return await embedding_handler.encode(
+            data.input,
+            long_input=data.long_input,
+            window_overlap=data.window_overlap,
+            window_pooling=data.window_pooling,
+            encoding=data.encoding,
+        )
+    except BadRequestError as e:
+        raise BadRequestError(error=e.error)
+    except NotFoundError as e:
+        raise NotFoundError(error=e.error)
+    except InternalServerError as e:
+        raise InternalServerError(error=e.error)
+
+
+@router.post("/{modality}/batch", response_model=BatchEmbeddingResponse)
+async def embed_batch(modality: str, data: BatchEmbeddingRequest):
+    embedding_handler = EmbeddingHandler(modality, data.model)
+    try:
+        return await embedding_handler.encode_batch(
+            data.input,
+            long_input=data.long_input,
+            window_overlap=data.window_overlap,
+            window_pooling=data.window_pooling,
+            encoding=data.encoding,
+        )
     except BadRequestError as e:
         raise BadRequestError(error=e.error)
     except NotFoundError as e:
@@ -32,4 +62,4 @@ async def embed_input(modality: str, data: EmbeddingRequest):
 @router.post("/{modality}/config", response_model=ConfigsResponse)
 async def get_dimensions(modality: str, data: ConfigsRequest):
     embedding_handler = EmbeddingHandler(modality, data.model)
-    return embedding_handler.get_configs()
+    return await embedding_handler.get_configs()
@@ -0,0 +1,35 @@
+import base64
+from enum import Enum
+
+import numpy as np
+
+
+class EmbeddingEncoding(str, Enum):
+    FLOAT = "float"
+    BASE64_FLOAT32 = "base64-float32"
+    BASE64_FLOAT16 = "base64-float16"
+
+
+_dtypes = {
+    EmbeddingEncoding.BASE64_FLOAT32: np.dtype("<f4"),
+    EmbeddingEncoding.BASE64_FLOAT16: np.dtype("<f2"),
+}
+
+
+def encode_vector(vector: np.ndarray, encoding: str = EmbeddingEncoding.FLOAT):
+    """
+    Serialize one embedding for the wire.
+
+    ``float`` returns a JSON float list, the base64 encodings return the vector
+    packed as little-endian float32/float16 so it can be decoded with
+    ``numpy.frombuffer`` on the other side.
+    """
+    encoding = EmbeddingEncoding(encoding)
+    if encoding == EmbeddingEncoding.FLOAT:
+        return vector.tolist()
+    packed = np.ascontiguousarray(vector, dtype=_dtypes[encoding])
+    return base64.b64encode(packed.data).decode("ascii")
+
+
+def encode_vectors(vectors: np.ndarray, encoding: str = EmbeddingEncoding.FLOAT):
+    return [encode_vector(vector, encoding) for vector in vectors]
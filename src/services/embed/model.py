@@ -1,6 +1,8 @@
 from enum import Enum
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Union
+
+from .encoding import EmbeddingEncoding
 
 
 class Modality(Enum):
@@ -10,9 +12,19 @@ class Modality(Enum):
     TEXT = "text"
 
 
+class LongInputStrategy(str, Enum):
+    TRUNCATE = "truncate"
+    WINDOW = "window"
+
+
+class WindowPooling(str, Enum):
+    MEAN = "mean"
+    WEIGHTED = "weighted"
+
+
 class ConfigsRequest(BaseModel):
     modality: Optional[Modality] = "text"
-    model: Optional[str] = "sentence-transformers/all-MiniLM-L6-v2"
+    model: Optional[str] = None
 
 
 class ConfigsResponse(BaseModel):
@@ -23,8 +35,30 @@ class ConfigsResponse(BaseModel):
 class EmbeddingRequest(BaseModel):
     input: str
     modality: Optional[Modality] = "text"
-    model: Optional[str] = "sentence-transformers/all-MiniLM-L6-v2"
+    # defaults per modality, see embed.service.default_models
+    model: Optional[str] = None
+    long_input: Optional[LongInputStrategy] = LongInputStrategy.TRUNCATE
+    window_overlap: Optional[int] = 64
+    window_pooling: Optional[WindowPooling] = WindowPooling.MEAN
+    encoding: Optional[EmbeddingEncoding] = EmbeddingEncoding.FLOAT
 
 
 class EmbeddingResponse(BaseModel):
-    embedding: List[float]
+    embedding: Union[List[float], str]
+    windows: Optional[int] = None
+
+
+class BatchEmbeddingRequest(BaseModel):
+    input: List[str]
+    modality: Optional[Modality] = "text"
+    # defaults per modality, see embed.service.default_models
+    model: Optional[str] = None
+    long_input: Optional[LongInputStrategy] = LongInputStrategy.TRUNCATE
+    window_overlap: Optional[int] = 64
+    window_pooling: Optional[WindowPooling] = WindowPooling.MEAN
+    encoding: Optional[EmbeddingEncoding] = EmbeddingEncoding.FLOAT
+
+
+class BatchEmbeddingResponse(BaseModel):
+    embeddings: List[Union[List[float], str]]
+    windows: Optional[List[int]] = None
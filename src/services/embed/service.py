@@ -1,47 +1,288 @@
-from transformers import AutoTokenizer, AutoModel
+from transformers import AutoConfig, AutoTokenizer, AutoModel
+from transformers.models.auto.tokenization_auto import get_tokenizer_config
+from PIL import Image
+import asyncio
+import functools
 import torch
 import torch.nn.functional as F
 import time
 
-from _utils import create_success_response
+from config import embed as embed_config
+from _registry import ModelRegistry
+from _executor import executors
+from _utils import create_success_response, download_file
 from _exceptions import BadRequestError
 
+from .batcher import MicroBatcher
+from .cache import embedding_cache
+from .encoding import encode_vector, encode_vectors
 from .text.service import TextEmbeddingService
+from .text.onnx_service import OnnxTextEmbeddingService
+from .video.service import CLIPEmbedder
 
-# from .modalities.image import ImageEmbeddingService
 # from .modalities.audio import AudioEmbeddingService
-# from .modalities.video import VideoEmbeddingService
+
+
+supported_modalities = ["text", "image", "video"]
+default_models = {
+    "text": "sentence-transformers/all-MiniLM-L6-v2",
+    "image": "openai/clip-vit-base-patch32",
+    "video": "openai/clip-vit-base-patch32",
+}
+
+# dimensions and token limits of the models in api/embed/model.py::Models, so
+# config lookups for them never touch the hub or the weights
+known_configs = {
+    ("text", "sentence-transformers/all-MiniLM-L6-v2"): (384, 512),
+    ("text", "nomic-ai/nomic-embed-text-v1"): (768, 8192),
+    ("text", "jinaai/jina-embeddings-v2-base-en"): (768, 8192),
+    ("text", "google-bert/bert-base-multilingual-uncased"): (768, 512),
+    ("image", "openai/clip-vit-base-patch32"): (512, 77),
+    ("video", "openai/clip-vit-base-patch32"): (512, 77),
+}
+embedding_models = ModelRegistry("embed", embed_config["memory_budget_mb"])
+batchers = {}
+
+
+text_backends = ("torch", "onnx", "onnx-int8")
+
+
+def _check_backend():
+    backend = embed_config["backend"]
+    if backend not in text_backends:
+        raise ValueError(
+            f"Unknown EMBED_BACKEND: {backend}, expected one of {', '.join(text_backends)}"
+        )
+    return backend
+
+
+def _text_service(model):
+    backend = _check_backend()
+    if backend == "torch":
+        return TextEmbeddingService(model)
+    return OnnxTextEmbeddingService(model, quantize=backend == "onnx-int8")
+
+
+def load_service(modality, model):
+    if modality == "text":
+        # sentence-transformers/all-MiniLM-L6-v2
+        return embedding_models.get(("text", model), lambda: _text_service(model))
+    elif modality in ("image", "video"):
+        # openai/clip-vit-base-patch32, one instance shared by both modalities
+        return embedding_models.get(("clip", model), lambda: CLIPEmbedder(model))
+    # elif modality == "audio":
+    #     # facebook/wav2vec2-base-960h
+    #     self.service = AudioEmbeddingService(model)
+    raise BadRequestError({"error": "Modality not supported"})
+
+
+@functools.lru_cache(maxsize=256)
+def read_configs(modality, model):
+    """
+    Return (dimensions, token_size) from the model and tokenizer configs alone,
+    without downloading or loading any weights.
+    """
+    if (modality, model) in known_configs:
+        return known_configs[(modality, model)]
+
+    config = AutoConfig.from_pretrained(model, trust_remote_code=True)
+    max_positions = getattr(config, "max_position_embeddings", None)
+    token_size = get_tokenizer_config(model).get("model_max_length")
+    # tokenizers without a limit report a huge sentinel value
+    if token_size is None or token_size > 1_000_000:
+        token_size = max_positions
+    # CLIP style configs expose the shared embedding size as projection_dim
+    dimensions = getattr(config, "projection_dim", None) or config.hidden_size
+    return dimensions, token_size
+
+
+def warmup_model(modality, model):
+    service = load_service(modality, model)
+    if modality == "text":
+        # straight to the model so a cached input can't skip the forward pass
+        service._encode(["warmup"])
+    else:
+        service.get_image_embeddings([Image.new("RGB", (224, 224))])
+
+
+def warmup_tasks():
+    # a typo fails startup rather than silently picking a backend
+    _check_backend()
+    tasks = {}
+    for model in embed_config["preload_models"]:
+        tasks[f"embed:text:{model}"] = functools.partial(warmup_model, "text", model)
+    for model in embed_config["preload_media_models"]:
+        tasks[f"embed:image:{model}"] = functools.partial(warmup_model, "image", model)
+    return tasks
+
+
+def get_batcher(modality, model):
+    key = (modality, model)
+    if key not in batchers:
+        # the service is resolved per batch so eviction never pins a model here
+        batchers[key] = MicroBatcher(
+            lambda inputs: load_service(modality, model).encode(inputs).numpy(),
+            executor=executors["embed"],
+            max_wait_ms=embed_config["batch_wait_ms"],
+            max_batch_size=embed_config["batch_max_size"],
+        )
+    return batchers[key]
+
+
+def get_stats():
+    return create_success_response(
+        {
+            "batchers": {
+                f"{modality}:{model}": batcher.stats()
+                for (modality, model), batcher in batchers.items()
+            },
+            "executor": executors["embed"].stats(),
+            "cache": embedding_cache.stats(),
+        }
+    )
 
 
 class EmbeddingHandler:
     def __init__(self, modality, model):
-        if modality == "text":
-            # sentence-transformers/all-MiniLM-L6-v2
-            self.service = TextEmbeddingService(model)
-        # elif modality == "image":
-        #     # openai/clip-vit-base-patch32
-        #     self.service = ImageEmbeddingService(model)
-        # elif modality == "audio":
-        #     # facebook/wav2vec2-base-960h
-        #     self.service = AudioEmbeddingService(model)
-        # elif modality == "video":
-        #     # openai/clip-vit-base-patch32
-        #     self.service = VideoEmbeddingService(model)
-        else:
+        if modality not in supported_modalities:
             raise BadRequestError({"error": "Modality not supported"})
+        self.modality = modality
+        self.model = model or default_models[modality]
+
+    @property
+    def service(self):
+        return load_service(self.modality, self.model)
+
+    async def encode(
+        self,
+        data,
+        long_input="truncate",
+        window_overlap=64,
+        window_pooling="mean",
+        encoding="float",
+    ):
+        if self.modality != "text":
+            embeddings = await self._encode_media([data], long_input)
+            return create_success_response(
+                {"embedding": encode_vector(embeddings[0], encoding)}
+            )
+
+        if long_input == "window":
+            embeddings, windows = await self._encode_windowed(
+                [data], window_overlap, window_pooling
+            )
+            return create_success_response(
+                {
+                    "embedding": encode_vector(embeddings[0], encoding),
+                    "windows": windows[0],
+                }
+            )
+
+        embedding = await get_batcher(self.modality, self.model).submit(data)
+        return create_success_response(
+            {
+                "embedding": encode_vector(embedding, encoding),
+            }
+        )
+
+    async def encode_batch(
+        self,
+        inputs,
+        long_input="truncate",
+        window_overlap=64,
+        window_pooling="mean",
+        encoding="float",
+    ):
+        if not inputs:
+            raise BadRequestError({"error": "Input list is empty"})
+        if len(inputs) > embed_config["max_batch_size"]:
+            raise BadRequestError(
+                {
+                    "error": f"Batch size {len(inputs)} exceeds the maximum of {embed_config['max_batch_size']}"
+                }
+            )
 
-    def encode(self, data):
-        embedding = self.service.encode(data).tolist()[0]
+        if self.modality != "text":
+            embeddings = await self._encode_media(inputs, long_input)
+            return create_success_response(
+                {"embeddings": encode_vectors(embeddings, encoding)}
+            )
+
+        if long_input == "window":
+            embeddings, windows = await self._encode_windowed(
+                inputs, window_overlap, window_pooling
+            )
+            return create_success_response(
+                {
+                    "embeddings": encode_vectors(embeddings, encoding),
+                    "windows": windows,
+                }
+            )
+
+        embeddings = await executors["embed"].run(
+            lambda: self.service.encode(inputs).numpy()
+        )
         return create_success_response(
             {
-                "embedding": embedding,
+                "embeddings": encode_vectors(embeddings, encoding),
             }
         )
 
-    def get_configs(self):
-        start_time = time.time() * 1000
-        dimensions = self.service.get_dimensions()
-        token_size = self.service.get_token_size()
+    async def _encode_windowed(self, inputs, window_overlap, window_pooling):
+        def encode():
+            embeddings, windows = self.service.encode_windowed(
+                inputs, window_overlap, window_pooling
+            )
+            return embeddings.cpu().numpy(), windows
+
+        return await executors["embed"].run(encode)
+
+    async def _encode_media(self, urls, long_input="truncate"):
+        if long_input == "window":
+            raise BadRequestError(
+                {"error": "long_input 'window' is only supported for text"}
+            )
+        downloads = await asyncio.gather(
+            *[download_file(url) for url in urls], return_exceptions=True
+        )
+        files = [d[0] for d in downloads if not isinstance(d, BaseException)]
+        for download in downloads:
+            if isinstance(download, BaseException):
+                for file in files:
+                    file.close()
+                raise download
+        batch_size = embed_config["frame_batch_size"]
+
+        def encode_images():
+            images = [Image.open(file).convert("RGB") for file in files]
+            return self.service.get_image_embeddings(images, batch_size).numpy()
+
+        def encode_videos():
+            embeddings = []
+            for file in files:
+                # OpenCV decodes the spooled download from disk in place
+                embedding = self.service.get_video_embedding(
+                    file.path, embed_config["video_fps"], batch_size
+                )
+                if not embedding.numel():
+                    raise BadRequestError({"error": "No frames could be decoded"})
+                embeddings.append(embedding)
+            return torch.stack(embeddings).numpy()
+
+        encode = encode_images if self.modality == "image" else encode_videos
+        try:
+            return await executors["embed_media"].run(encode)
+        finally:
+            for file in files:
+                file.close()
+
+    async def get_configs(self):
+        if (self.modality, self.model) in known_configs:
+            dimensions, token_size = read_configs(self.modality, self.model)
+        else:
+            dimensions, token_size = await executors["embed"].run(
+                read_configs, self.modality, self.model
+            )
         return create_success_response(
             {"dimensions": dimensions, "token_size": token_size}
         )
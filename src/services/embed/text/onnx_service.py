@@ -0,0 +1,149 @@
+import argparse
+import inspect
+import logging
+import os
+
+import torch
+from transformers import AutoConfig
+
+from config import embed as embed_config
+from _exceptions import InternalServerError
+
+from .service import TextEmbeddingService
+
+log = logging.getLogger(__name__)
+
+# sentences used to compare the exported model against the torch output
+ACCURACY_SAMPLES = [
+    "The quarterly report shows revenue growth across every region.",
+    "Either party may terminate this agreement with thirty days written notice.",
+    "How do I reset my password?",
+    "Mixpeek listens in on changes to your database and processes each change.",
+]
+
+
+def artifact_paths(model):
+    directory = os.path.join(embed_config["onnx_cache_dir"], model.replace("/", "--"))
+    return (
+        os.path.join(directory, "model.onnx"),
+        os.path.join(directory, "model.int8.onnx"),
+    )
+
+
+def cosine_similarities(reference, candidate, sentences=ACCURACY_SAMPLES):
+    """Row-wise cosine similarity of two services' (normalized) embeddings."""
+    return (reference._encode(sentences) * candidate._encode(sentences)).sum(dim=1)
+
+
+def export(model, quantize=False):
+    """
+    Export ``model`` to ONNX (and optionally int8) once and return the artifact path.
+
+    Freshly exported artifacts are compared against the torch output and discarded
+    if the cosine similarity of any sample drops below ``onnx_min_similarity``.
+    """
+    fp32_path, int8_path = artifact_paths(model)
+    path = int8_path if quantize else fp32_path
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    reference = TextEmbeddingService(model)
+    reference.device = torch.device("cpu")
+    reference.model = reference.model.to(reference.device).eval()
+
+    if not os.path.exists(fp32_path):
+        dummy_input = reference.tokenizer(["hello world"], return_tensors="pt")
+        # pass inputs positionally in the order of the model's forward signature
+        input_names = [
+            name
+            for name in inspect.signature(reference.model.forward).parameters
+            if name in dummy_input
+        ]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+        tmp_path = f"{fp32_path}.tmp"
+        torch.onnx.export(
+            reference.model,
+            tuple(dummy_input[name] for name in input_names),
+            tmp_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+        os.replace(tmp_path, fp32_path)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        tmp_path = f"{int8_path}.tmp"
+        quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, int8_path)
+
+    candidate = OnnxTextEmbeddingService(model, quantize=quantize)
+    similarity = cosine_similarities(reference, candidate).min().item()
+    log.info("%s onnx export (int8=%s) min cosine %.4f", model, quantize, similarity)
+    if similarity < embed_config["onnx_min_similarity"]:
+        os.remove(path)
+        raise InternalServerError(
+            error={
+                "message": f"ONNX export of {model} failed the accuracy check (cosine {similarity:.4f})"
+            }
+        )
+    return path
+
+
+class OnnxTextEmbeddingService(TextEmbeddingService):
+    """
+    TextEmbeddingService that runs the transformer through ONNX Runtime on CPU.
+
+    Tokenization, bucketing, windowing, pooling and caching are inherited; only the
+    forward pass differs. Artifacts are exported on first use and reused afterwards.
+    """
+
+    def __init__(self, model, quantize=False):
+        self.quantize = quantize
+        self.backend = "onnx-int8" if quantize else "onnx"
+        super().__init__(model)
+        self.device = torch.device("cpu")
+
+    def load_model(self, model):
+        import onnxruntime
+
+        self.path = export(model, quantize=self.quantize)
+        self.config = AutoConfig.from_pretrained(model, trust_remote_code=True)
+        self.model = None
+        self.session = onnxruntime.InferenceSession(
+            self.path, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def forward(self, encoded_input):
+        inputs = {
+            name: encoded_input[name].cpu().numpy()
+            for name in self.input_names
+            if name in encoded_input
+        }
+        (last_hidden_state,) = self.session.run(["last_hidden_state"], inputs)
+        return (torch.from_numpy(last_hidden_state),)
+
+    def memory_footprint(self):
+        return os.path.getsize(self.path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export a model to ONNX and check it against the torch output"
+    )
+    parser.add_argument("model")
+    parser.add_argument("--quantize", action="store_true")
+    args = parser.parse_args()
+
+    path = export(args.model, quantize=args.quantize)
+    similarity = cosine_similarities(
+        TextEmbeddingService(args.model),
+        OnnxTextEmbeddingService(args.model, quantize=args.quantize),
+    )
+    print(f"{path}: cosine min {similarity.min():.4f} mean {similarity.mean():.4f}")
@@ -1,18 +1,43 @@
 from transformers import AutoTokenizer, AutoModel, logging
+import numpy as np
 import torch
 import torch.nn.functional as F
 import time
 
+from config import embed as embed_config
+from _exceptions import BadRequestError
+from ..cache import embedding_cache
+
 logging.set_verbosity_error()
 
 
 class TextEmbeddingService:
+    # outputs are mean pooled and L2 normalized, part of the cache key
+    normalization = "mean-l2"
+    backend = "torch"
+
     def __init__(self, model):
+        self.model_name = model
+        self.cache = embedding_cache
+        self.bucket_size = embed_config["bucket_size"]
+        self.max_windows = embed_config["max_batch_size"]
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.tokenizer = AutoTokenizer.from_pretrained(model, trust_remote_code=True)
+        self.load_model(model)
+
+    def load_model(self, model):
         self.model = AutoModel.from_pretrained(model, trust_remote_code=True).to(
             self.device
         )
+        self.config = self.model.config
+
+    def forward(self, encoded_input):
+        with torch.no_grad():
+            return self.model(**encoded_input)
+
+    @property
+    def cache_namespace(self):
+        return f"{self.model_name}:{self.normalization}:{self.backend}"
 
     def mean_pooling(self, model_output, attention_mask):
         token_embeddings = model_output[0]
@@ -24,22 +49,136 @@ class TextEmbeddingService:
         )
 
     def encode(self, sentences):
+        if isinstance(sentences, str):
+            sentences = [sentences]
+
+        keys = [self.cache.make_key(self.cache_namespace, s) for s in sentences]
+        vectors = self.cache.get_many(keys)
+
+        # only encode each distinct missing text once
+        missing = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(keys[i], sentences[i])
+
+        if missing:
+            computed = self._encode(list(missing.values())).cpu().numpy()
+            self.cache.put_many(list(missing.keys()), computed)
+            computed_by_key = dict(zip(missing.keys(), computed))
+            vectors = [
+                computed_by_key[key] if vector is None else vector
+                for key, vector in zip(keys, vectors)
+            ]
+
+        return torch.from_numpy(np.stack(vectors))
+
+    def _encode(self, sentences, bucketed=True):
+        if not bucketed or len(sentences) <= self.bucket_size:
+            encoded_input = self.tokenizer(
+                sentences, padding=True, truncation=True, return_tensors="pt"
+            )
+            return self._embed(encoded_input)
+
+        # sort by token length so each bucket pads to a similar length instead
+        # of the longest input in the whole request
+        encoded = self.tokenizer(sentences, truncation=True)
+        order = sorted(
+            range(len(sentences)), key=lambda i: len(encoded["input_ids"][i])
+        )
+
+        sentence_embeddings = None
+        for start in range(0, len(order), self.bucket_size):
+            bucket = order[start : start + self.bucket_size]
+            encoded_input = self.tokenizer.pad(
+                {key: [encoded[key][i] for i in bucket] for key in encoded.keys()},
+                return_tensors="pt",
+            )
+            bucket_embeddings = self._embed(encoded_input)
+            if sentence_embeddings is None:
+                sentence_embeddings = bucket_embeddings.new_empty(
+                    (len(sentences), bucket_embeddings.shape[1])
+                )
+            sentence_embeddings[bucket] = bucket_embeddings
+
+        return sentence_embeddings
+
+    def encode_windowed(self, sentences, overlap, pooling):
+        """
+        Embed inputs longer than the model limit by splitting each one into
+        overlapping token windows and pooling the window vectors into one.
+
+        Returns the normalized embeddings and the number of windows per input.
+        Windowed embeddings are not cached since they depend on the settings.
+        """
+        if not self.tokenizer.is_fast:
+            raise BadRequestError(
+                {"error": f"{self.model_name} does not support windowed inputs"}
+            )
+        max_length = min(self.get_token_size(), self.config.max_position_embeddings)
+        if overlap < 0 or overlap >= max_length // 2:
+            raise BadRequestError(
+                {"error": f"window_overlap must be between 0 and {max_length // 2 - 1}"}
+            )
+
         encoded_input = self.tokenizer(
-            sentences, padding=True, truncation=True, return_tensors="pt"
-        ).to(self.device)
+            sentences,
+            padding=True,
+            truncation=True,
+            max_length=max_length,
+            stride=overlap,
+            return_overflowing_tokens=True,
+            return_tensors="pt",
+        )
+        sample_mapping = encoded_input.pop("overflow_to_sample_mapping")
+        token_counts = encoded_input["attention_mask"].sum(dim=1)
 
-        with torch.no_grad():
-            model_output = self.model(**encoded_input)
+        # windows of every input are encoded together, max_windows at a time
+        window_embeddings = torch.cat(
+            [
+                self._embed(
+                    {
+                        key: value[start : start + self.max_windows]
+                        for key, value in encoded_input.items()
+                    },
+                    normalize=False,
+                )
+                for start in range(0, len(sample_mapping), self.max_windows)
+            ]
+        )
+
+        if pooling == "weighted":
+            weights = token_counts.to(window_embeddings.dtype)
+        else:
+            weights = torch.ones_like(token_counts, dtype=window_embeddings.dtype)
+        weights = weights.to(window_embeddings.device)
+        sample_mapping = sample_mapping.to(window_embeddings.device)
+
+        pooled = window_embeddings.new_zeros(
+            (len(sentences), window_embeddings.shape[1])
+        )
+        pooled.index_add_(0, sample_mapping, window_embeddings * weights.unsqueeze(1))
+        totals = pooled.new_zeros(len(sentences)).index_add_(0, sample_mapping, weights)
+        pooled = pooled / totals.unsqueeze(1)
+
+        windows = torch.bincount(sample_mapping, minlength=len(sentences)).tolist()
+        return F.normalize(pooled, p=2, dim=1), windows
+
+    def _embed(self, encoded_input, normalize=True):
+        encoded_input = {
+            key: value.to(self.device) for key, value in encoded_input.items()
+        }
+
+        model_output = self.forward(encoded_input)
 
         sentence_embeddings = self.mean_pooling(
             model_output, encoded_input["attention_mask"]
         )
-        sentence_embeddings = F.normalize(sentence_embeddings, p=2, dim=1)
-
-        return sentence_embeddings
+        if not normalize:
+            return sentence_embeddings
+        return F.normalize(sentence_embeddings, p=2, dim=1)
 
     def get_dimensions(self):
-        return self.model.config.hidden_size
+        return self.config.hidden_size
 
     def get_token_size(self):
         return self.tokenizer.model_max_length
@@ -0,0 +1,70 @@
+import time
+
+import cv2
+from PIL import Image
+
+
+class FrameSampler:
+    """
+    Samples frames from a video at ``fps`` in a single sequential pass.
+
+    Every frame is demuxed with ``grab()`` but only the sampled ones are decoded
+    to pixels with ``retrieve()``, so there are no seeks and no keyframe
+    re-decodes. Sampled frames are resized so their shortest side is ``size``
+    (CLIP's input resolution) before they are handed out, which keeps the
+    memory held per frame small regardless of the source resolution.
+    """
+
+    def __init__(self, video_path, fps=1, size=224):
+        self.video_path = video_path
+        self.fps = fps
+        self.size = size
+        self.decoded = 0
+        self.sampled = 0
+        self.seconds = 0.0
+
+    def _resize(self, frame):
+        height, width = frame.shape[:2]
+        scale = self.size / min(height, width)
+        if scale < 1:
+            frame = cv2.resize(
+                frame,
+                (round(width * scale), round(height * scale)),
+                interpolation=cv2.INTER_AREA,
+            )
+        return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+    def __iter__(self):
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            video_fps = cap.get(cv2.CAP_PROP_FPS)
+            # sample every frame when the source rate is unknown or lower than fps
+            step = video_fps / self.fps if video_fps and video_fps > self.fps else 1
+            next_sample = 0.0
+            # only time spent decoding counts, not time the consumer holds a frame
+            clock = time.perf_counter()
+            while cap.grab():
+                index = self.decoded
+                self.decoded += 1
+                if index < int(next_sample):
+                    continue
+                next_sample += step
+                success, frame = cap.retrieve()
+                if not success:
+                    continue
+                self.sampled += 1
+                image = self._resize(frame)
+                self.seconds += time.perf_counter() - clock
+                yield image
+                clock = time.perf_counter()
+            self.seconds += time.perf_counter() - clock
+        finally:
+            cap.release()
+
+    def stats(self) -> dict:
+        return {
+            "decoded": self.decoded,
+            "sampled": self.sampled,
+            "seconds": self.seconds,
+            "frames_per_second": self.decoded / self.seconds if self.seconds else 0.0,
+        }
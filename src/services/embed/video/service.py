@@ -1,8 +1,10 @@
 from transformers import CLIPProcessor, CLIPModel
+import logging
 import torch
-from PIL import Image
-import cv2
-import numpy as np
+
+from .sampler import FrameSampler
+
+log = logging.getLogger(__name__)
 
 
 class CLIPEmbedder:
@@ -19,6 +21,17 @@ class CLIPEmbedder:
             image_embedding.cpu()
         )  # Move the embedding back to CPU for further processing or storage
 
+    def get_image_embeddings(self, images, batch_size=32):
+        # one forward pass per batch of images rather than per image
+        embeddings = []
+        for start in range(0, len(images), batch_size):
+            inputs = self.processor(
+                images=images[start : start + batch_size], return_tensors="pt"
+            ).to(self.device)
+            with torch.no_grad():
+                embeddings.append(self.model.get_image_features(**inputs).cpu())
+        return torch.cat(embeddings)
+
     def get_text_embedding(self, text_query):
         inputs = self.processor(
             text=text_query, return_tensors="pt", padding=True, truncation=True
@@ -27,42 +40,45 @@ class CLIPEmbedder:
             text_embedding = self.model.get_text_features(**inputs)
         return text_embedding.cpu()  # Move the embedding back to CPU
 
-    def get_video_embedding(self, video_path, fps=1):
-        cap = cv2.VideoCapture(video_path)
-        video_fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        embeddings = []
-
-        frame_indices = [
-            int(video_fps / fps * i) for i in range(int(frame_count / video_fps * fps))
-        ]
-        current_frame_index = 0
-        success, frame = cap.read()
-
-        while success and current_frame_index < len(frame_indices):
-            if current_frame_index == frame_indices[current_frame_index]:
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frame_image = Image.fromarray(frame)
+    def get_video_embedding(self, video_path, fps=1, batch_size=32):
+        sampler = FrameSampler(video_path, fps=fps)
+        frames = []
+        embedding_sum = None
+        embedding_count = 0
 
-                frame_embedding = self.get_image_embedding(frame_image)
-                embeddings.append(frame_embedding)
+        def flush():
+            nonlocal embedding_sum, embedding_count
+            embeddings = self.get_image_embeddings(frames, batch_size)
+            batch_sum = embeddings.sum(dim=0)
+            embedding_sum = (
+                batch_sum if embedding_sum is None else embedding_sum + batch_sum
+            )
+            embedding_count += len(frames)
+            frames.clear()
 
-                if current_frame_index + 1 < len(frame_indices):
-                    cap.set(
-                        cv2.CAP_PROP_POS_FRAMES, frame_indices[current_frame_index + 1]
-                    )
-            current_frame_index += 1
-            success, frame = cap.read()
+        # frames are decoded lazily, so at most one batch is held at a time
+        for frame in sampler:
+            frames.append(frame)
+            if len(frames) == batch_size:
+                flush()
+        if frames:
+            flush()
 
-        cap.release()
+        stats = sampler.stats()
+        log.info(
+            "sampled %d of %d frames from %s at %.1f frames/s",
+            stats["sampled"],
+            stats["decoded"],
+            video_path,
+            stats["frames_per_second"],
+        )
 
-        if embeddings:
-            embeddings = torch.stack(embeddings).to(self.device)
-            mean_embedding = torch.mean(embeddings, dim=0)
+        if embedding_count:
+            mean_embedding = embedding_sum / embedding_count
         else:
-            mean_embedding = torch.empty(0).to(self.device)
+            mean_embedding = torch.empty(0)
 
-        return mean_embedding.cpu()  # Move the mean embedding back to CPU
+        return mean_embedding  # already on CPU
 
 
 # Example usage remains the same
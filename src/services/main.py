@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
@@ -8,16 +10,35 @@ from _exceptions import (
     InternalServerError,
     NotFoundError,
     BadRequestError,
+    TooManyRequestsError,
 )
 from _utils import create_json_response
 
-from api import api_router
+from _http import http_pool
+from _warmup import warmup
 
+from api import api_router
+from embed.service import embedding_models, warmup_tasks as embed_warmup_tasks
+from parse.registry import parse_models
+from parse.service import warmup_tasks as parse_warmup_tasks
 
 log = logging.getLogger(__name__)
 
 
-app = FastAPI(openapi_url="/docs/openapi.json", title="Mixpeek Services API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # models warm in the background, /readiness reports 503 until they are done
+    warmup.start(
+        {**embed_warmup_tasks(), **parse_warmup_tasks()},
+        registries=[embedding_models, parse_models],
+    )
+    yield
+    await http_pool.aclose()
+
+
+app = FastAPI(
+    openapi_url="/docs/openapi.json", title="Mixpeek Services API", lifespan=lifespan
+)
 # app = FastAPI(redirect_slashes=False)
 
 
@@ -36,6 +57,16 @@ async def bad_request_exception_handler(request: Request, exc: BadRequestError):
     return create_json_response(exc.success, exc.status, exc.error, exc.response)
 
 
+@app.exception_handler(TooManyRequestsError)
+async def too_many_requests_exception_handler(
+    request: Request, exc: TooManyRequestsError
+):
+    headers = {"Retry-After": str(exc.retry_after)} if exc.retry_after else None
+    return create_json_response(
+        exc.success, exc.status, exc.error, exc.response, headers=headers
+    )
+
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     return create_json_response(False, 422, exc.errors(), None)
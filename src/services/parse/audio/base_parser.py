@@ -1,12 +1,14 @@
-from io import BytesIO
-from typing import Union, Dict, List
+from typing import Iterator, Optional, Union, Dict, List
 import torch
-from pydub import AudioSegment
 import numpy as np
 from transformers import Speech2TextProcessor, Speech2TextForConditionalGeneration
 from datetime import timedelta
 import uuid
+from config import parse as parse_config
 from _exceptions import InternalServerError
+from _spool import SpooledFile
+
+from .decoder import SAMPLE_RATE, iter_windows
 
 
 class AudioParser:
@@ -22,72 +24,85 @@ class AudioParser:
             "facebook/s2t-small-librispeech-asr"
         )
 
-    def preprocess_audio(self, audio: AudioSegment) -> AudioSegment:
-        return audio.set_frame_rate(16000)
+    def warmup(self):
+        self.transcribe_batch([np.zeros(SAMPLE_RATE, dtype=np.float32)])
+
+    def parse(
+        self, file_stream: SpooledFile, params: Dict, file_ext: Optional[str] = None
+    ) -> Union[List[Dict], str]:
+        return list(self.iter_output(file_stream, params, file_ext))
 
-    def parse(self, file_stream: BytesIO, params: Dict) -> Union[List[Dict], str]:
+    def iter_output(
+        self, file_stream: SpooledFile, params: Dict, file_ext: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """
+        Yield one transcribed chunk per interval, a batch of intervals at a time.
+
+        The audio is decoded by ffmpeg as it is transcribed, so at most one
+        batch of intervals is in memory however long the file is.
+        """
         try:
             settings = params.audio_settings
-            audio = AudioSegment.from_mp3(file_stream)
-            audio = self.preprocess_audio(audio)  # Resample audio to 16000 Hz
+            batch_size = settings.get("batch_size") or parse_config["asr_batch_size"]
             interval_length_ms = (
                 settings["interval_range"] * 1000
             )  # Convert seconds to milliseconds
-            chunks_dict = []
+
+            # ffmpeg reads the spooled download from disk in place
+            windows = iter_windows(
+                file_stream.path, settings["interval_range"], file_ext
+            )
             segment_number = 0
-            for i in range(0, len(audio), interval_length_ms):
-                # Slice the audio into a segment of length 'interval_length_ms' starting at index 'i'
-                segment = audio[i : i + interval_length_ms]
-                text = self.transcribe_audio(segment)
-                segment_number += 1
-                chunk_dict = {
-                    "text": text,
-                    "element_id": str(uuid.uuid4()),
-                    "metadata": {
-                        "timestamp_start": str(timedelta(milliseconds=i)),
-                        "timestamp_end": str(
-                            timedelta(milliseconds=i + interval_length_ms)
-                        ),
-                        "languages": ["eng"],
-                        "segment_number": segment_number,
-                    },
-                }
-                chunks_dict.append(chunk_dict)
-            return chunks_dict
+            batch = []
+            for window in windows:
+                batch.append(window)
+                if len(batch) < batch_size:
+                    continue
+                yield from self._chunks(batch, segment_number, interval_length_ms)
+                segment_number += len(batch)
+                batch = []
+            if batch:
+                yield from self._chunks(batch, segment_number, interval_length_ms)
         except Exception as e:
             raise InternalServerError(
-                error=f"Failed to parse MP3. Please try again. If the issue persists, contact support. Exception: {e}"
+                error=f"Failed to parse audio. Please try again. If the issue persists, contact support. Exception: {e}"
             )
 
-    def transcribe_audio(self, audio_segment: AudioSegment) -> List[Dict]:
-        # Convert the audio segment into an array of samples
-        samples = np.array(audio_segment.get_array_of_samples())
-
-        # If the audio is stereo (2 channels), convert it to mono by taking the mean of the two channels
-        if audio_segment.channels == 2:
-            samples = np.mean(samples.reshape((-1, 2)), axis=1)
+    def _chunks(
+        self, batch: List[np.ndarray], first_segment: int, interval_length_ms: int
+    ) -> Iterator[Dict]:
+        texts = self.transcribe_batch(batch)
+        for segment_number, text in enumerate(texts, start=first_segment + 1):
+            i = (segment_number - 1) * interval_length_ms
+            yield {
+                "text": text,
+                "element_id": str(uuid.uuid4()),
+                "metadata": {
+                    "timestamp_start": str(timedelta(milliseconds=i)),
+                    "timestamp_end": str(
+                        timedelta(milliseconds=i + interval_length_ms)
+                    ),
+                    "languages": ["eng"],
+                    "segment_number": segment_number,
+                },
+            }
 
-        # Get the sample rate of the audio segment
-        sample_rate = audio_segment.frame_rate
-
-        # Use the processor to prepare the samples for the model
-        # The processor resamples the audio to the sample rate the model was trained on, and converts the audio samples into the format expected by the model
+    def transcribe_batch(self, windows: List[np.ndarray]) -> List[str]:
+        """Transcribe 16 kHz mono float32 windows with one generate call."""
+        # The processor converts each window into filterbank features, padding
+        # shorter ones (the last window) to the longest with an attention mask
         inputs = self.processor(
-            samples, sampling_rate=sample_rate, return_tensors="pt"
+            windows,
+            sampling_rate=SAMPLE_RATE,
+            padding=True,
+            return_tensors="pt",
         ).to(self.device)
 
-        # Use the model to generate the IDs of the tokens in the transcription
-        # The model takes the processed audio samples and returns the IDs of the tokens in the transcription
+        # Use the model to generate the IDs of the tokens in every transcription at once
         with torch.no_grad():
             generated_ids = self.model.generate(
                 inputs["input_features"], attention_mask=inputs["attention_mask"]
             )
 
-        # Use the processor to convert the token IDs into text
-        # The processor takes the token IDs and returns the corresponding text
-        transcription_text = self.processor.batch_decode(
-            generated_ids, skip_special_tokens=True
-        )[0]
-
-        # Return the transcription text
-        return transcription_text
+        # Use the processor to convert the token IDs into one text per window
+        return self.processor.batch_decode(generated_ids, skip_special_tokens=True)
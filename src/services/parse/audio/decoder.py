@@ -0,0 +1,60 @@
+import subprocess
+import tempfile
+from typing import Iterator, Optional
+
+import numpy as np
+
+from config import parse as parse_config
+
+SAMPLE_RATE = 16000
+
+# magika label -> ffmpeg demuxer, anything else is probed by ffmpeg
+demuxers = {
+    "mp3": "mp3",
+    "wav": "wav",
+    "flac": "flac",
+    "ogg": "ogg",
+    "aac": "aac",
+    "aiff": "aiff",
+    "mp4": "mp4",
+    "webm": "webm",
+}
+
+
+def iter_windows(
+    path: str, window_seconds: float, file_ext: Optional[str] = None
+) -> Iterator[np.ndarray]:
+    """
+    Decode an audio file with ffmpeg into 16 kHz mono float32 windows of
+    ``window_seconds``, yielded as they are decoded.
+
+    Only one window is held at a time however long the file is. The last
+    window is shorter when the audio doesn't divide evenly.
+    """
+    command = [parse_config["ffmpeg_path"], "-nostdin", "-loglevel", "error"]
+    demuxer = demuxers.get((file_ext or "").lower())
+    if demuxer:
+        command += ["-f", demuxer]
+    command += ["-i", path, "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE)]
+    command += ["-f", "f32le", "pipe:1"]
+
+    window_bytes = int(window_seconds * SAMPLE_RATE) * np.dtype(np.float32).itemsize
+    # a file rather than a pipe, so a chatty ffmpeg can't block on a full stderr
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr)
+        try:
+            while True:
+                data = process.stdout.read(window_bytes)
+                if not data:
+                    break
+                yield np.frombuffer(data, dtype=np.float32)
+            if process.wait() != 0:
+                stderr.seek(0)
+                message = stderr.read().decode("utf-8", "replace").strip()
+                raise RuntimeError(f"ffmpeg could not decode the audio: {message}")
+        finally:
+            if process.poll() is None:
+                # the consumer stopped early
+                process.kill()
+            process.stdout.close()
+            process.wait()
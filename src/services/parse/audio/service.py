@@ -2,8 +2,11 @@ from ..model import ParseFileRequest
 from .base_parser import AudioParser
 
 from io import BytesIO
-from typing import Union, List, Dict
+from typing import AsyncIterator, Union, List, Dict
 from _exceptions import BadRequestError
+from _executor import executors
+
+from ..registry import parse_models
 
 from abc import ABC, abstractmethod
 from io import BytesIO
@@ -19,20 +22,22 @@ class ParserInterface(ABC):
 
 
 class ParserFactory:
+    parsers = {
+        "mp3": AudioParser,
+        "wav": AudioParser,
+        "aac": AudioParser,
+        "aiff": AudioParser,
+        "flac": AudioParser,
+        "ogg": AudioParser,
+    }
+
     @staticmethod
     def get_parser(file_ext: str) -> ParserInterface:
-        parsers = {
-            "mp3": AudioParser(),
-            "wav": AudioParser(),
-            "aac": AudioParser(),
-            "aiff": AudioParser(),
-            "flac": AudioParser(),
-            "ogg": AudioParser(),
-        }
-        parser = parsers.get(file_ext.lower())
-        if not parser:
+        parser_class = ParserFactory.parsers.get(file_ext.lower())
+        if not parser_class:
             raise BadRequestError(error=f"Unsupported file type: {file_ext.lower()}")
-        return parser
+        # loaded once and shared by every extension
+        return parse_models.get("audio", parser_class)
 
 
 class AudioParsingService:
@@ -45,8 +50,20 @@ class AudioParsingService:
         self.parser_request = parser_request
 
     async def parse(self) -> Union[List[Dict], str]:
+        return await executors["parse_audio"].run(self._parse)
+
+    def _parse(self) -> Union[List[Dict], str]:
         parser = ParserFactory.get_parser(self.file_ext)
         return parser.parse(
             file_stream=self.file_stream,
             params=self.parser_request,
+            file_ext=self.file_ext,
         )
+
+    def stream(self) -> AsyncIterator[Union[Dict, str]]:
+        return executors["parse_audio"].iterate(self._iter_output)
+
+    def _iter_output(self):
+        parser = ParserFactory.get_parser(self.file_ext)
+        # the magika label picks the ffmpeg demuxer
+        return parser.iter_output(self.file_stream, self.parser_request, self.file_ext)
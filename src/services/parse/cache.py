@@ -0,0 +1,119 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Optional
+
+from config import parse as parse_config
+from _spool import SpooledFile
+
+from .model import ParseFileRequest
+
+log = logging.getLogger(__name__)
+
+# bump when parser output changes so stale results are never served
+CACHE_VERSION = 4
+
+# request fields that locate the input rather than change how it is parsed
+_ignored_fields = {"file_url", "contents"}
+
+
+def file_digest(stream: SpooledFile) -> str:
+    digest = hashlib.sha256()
+    with stream.view() as view:
+        digest.update(view)
+    return digest.hexdigest()
+
+
+def make_key(modality: str, file_sha256: str, parser_request: ParseFileRequest) -> str:
+    settings = parser_request.model_dump(exclude=_ignored_fields)
+    canonical = json.dumps(
+        [CACHE_VERSION, modality, settings], sort_keys=True, separators=(",", ":")
+    )
+    return f"{file_sha256}-{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+
+class ParseCache:
+    """
+    On-disk cache of parse results keyed by file content and parse settings.
+
+    Each result is one JSON file. Reads refresh the file's mtime, and once the
+    directory grows past ``max_bytes`` the least recently used results are
+    deleted until it is back under budget.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._size = sum(size for _, _, size in self._files())
+
+    def _files(self):
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                yield entry.path, stat.st_mtime, stat.st_size
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._file(key)
+        try:
+            with open(path, "rb") as f:
+                result = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: dict):
+        try:
+            data = json.dumps(result).encode("utf-8")
+        except (TypeError, ValueError):
+            # e.g. numpy arrays in video detections
+            log.info("parse result for %s is not JSON serializable, not cached", key)
+            return
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        path = self._file(key)
+        with self._lock:
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            self._size += len(data) - previous
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        for path, _, size in sorted(self._files(), key=lambda file: file[1]):
+            if self._size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            self._size -= size
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+parse_cache = (
+    ParseCache(parse_config["cache_dir"], parse_config["cache_max_mb"] * 1024 * 1024)
+    if parse_config["cache_dir"]
+    else None
+)
@@ -1,16 +1,19 @@
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 
 from .model import ParseFileRequest
-from .service import ParseHandler
+from .service import ParseHandler, get_stats
 from _exceptions import route_exeception_handler
-from _utils import check_cpu_usage
-
 
 router = APIRouter()
 
 
+@router.get("/stats")
+async def parse_stats():
+    return get_stats()
+
+
 @router.post("/{modality}")
-@check_cpu_usage
 @route_exeception_handler
 async def parse_file(
     modality: str,
@@ -18,3 +21,20 @@ async def parse_file(
 ):
     parse_handler = ParseHandler(parser_request.file_url, parser_request.contents)
     return await parse_handler.parse(modality=modality, parser_request=parser_request)
+
+
+@router.post("/{modality}/stream")
+@route_exeception_handler
+async def parse_file_stream(
+    modality: str,
+    parser_request: ParseFileRequest,
+):
+    """
+    Parse a file, streaming NDJSON chunks as they are parsed and a final
+    metadata line, see ParseHandler.parse_stream.
+    """
+    parse_handler = ParseHandler(parser_request.file_url, parser_request.contents)
+    lines = await parse_handler.parse_stream(
+        modality=modality, parser_request=parser_request
+    )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
@@ -9,17 +9,10 @@ from _exceptions import InternalServerError
 class ImageParser:
     def __init__(self):
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model = None
-        self.feature_extractor = None
-        self.tokenizer = None
-
-    def init_model(self, strategy):
-        # Initialize model, processor, and tokenizer based on strategy
-        if strategy not in ["ocr", "object", "auto"]:
-            raise ValueError(
-                "Unsupported strategy. Choose either 'ocr' or 'object' or 'auto'."
-            )
+        self.init_model()
 
+    def init_model(self):
+        # every strategy currently captions with the same model
         self.model = VisionEncoderDecoderModel.from_pretrained(
             "nlpconnect/vit-gpt2-image-captioning"
         ).to(self.device)
@@ -30,6 +23,12 @@ class ImageParser:
             "nlpconnect/vit-gpt2-image-captioning"
         )
 
+    def warmup(self):
+        pixel_values = self.feature_extractor(
+            images=[Image.new("RGB", (224, 224))], return_tensors="pt"
+        ).pixel_values.to(self.device)
+        self.model.generate(pixel_values, max_length=2)
+
     def parse(
         self, file_stream: BytesIO, params: Dict = None
     ) -> Union[List[Dict], str]:
@@ -39,7 +38,10 @@ class ImageParser:
                 "Strategy not specified in params['image_settings']['strategy']"
             )
 
-        self.init_model(strategy)
+        if strategy not in ["ocr", "object", "auto"]:
+            raise ValueError(
+                "Unsupported strategy. Choose either 'ocr' or 'object' or 'auto'."
+            )
 
         try:
             # Load image from the file stream
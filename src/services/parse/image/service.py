@@ -2,8 +2,12 @@ from ..model import ParseFileRequest
 from .base_parser import ImageParser
 
 from io import BytesIO
-from typing import Union, List, Dict
+from typing import AsyncIterator, Union, List, Dict
 from _exceptions import BadRequestError
+from _executor import executors
+
+from ..registry import parse_models
+from ..utils import iter_parser_output
 
 from abc import ABC, abstractmethod
 from io import BytesIO
@@ -19,21 +23,23 @@ class ParserInterface(ABC):
 
 
 class ParserFactory:
+    parsers = {
+        "png": ImageParser,
+        "jpg": ImageParser,
+        "jpeg": ImageParser,
+        "bmp": ImageParser,
+        "gif": ImageParser,
+        "tiff": ImageParser,
+        "jfif": ImageParser,
+    }
+
     @staticmethod
     def get_parser(file_ext: str) -> ParserInterface:
-        parsers = {
-            "png": ImageParser(),
-            "jpg": ImageParser(),
-            "jpeg": ImageParser(),
-            "bmp": ImageParser(),
-            "gif": ImageParser(),
-            "tiff": ImageParser(),
-            "jfif": ImageParser(),
-        }
-        parser = parsers.get(file_ext.lower())
-        if not parser:
+        parser_class = ParserFactory.parsers.get(file_ext.lower())
+        if not parser_class:
             raise BadRequestError(error=f"Unsupported file type: {file_ext.lower()}")
-        return parser
+        # loaded once and shared by every extension
+        return parse_models.get("image", parser_class)
 
 
 class ImageParsingService:
@@ -46,8 +52,18 @@ class ImageParsingService:
         self.parser_request = parser_request
 
     async def parse(self) -> Union[List[Dict], str]:
+        return await executors["parse_image"].run(self._parse)
+
+    def _parse(self) -> Union[List[Dict], str]:
         parser = ParserFactory.get_parser(self.file_ext)
         return parser.parse(
             file_stream=self.file_stream,
             params=self.parser_request,
         )
+
+    def stream(self) -> AsyncIterator[Union[Dict, str]]:
+        return executors["parse_image"].iterate(self._iter_output)
+
+    def _iter_output(self):
+        parser = ParserFactory.get_parser(self.file_ext)
+        return iter_parser_output(parser, self.file_stream, self.parser_request)
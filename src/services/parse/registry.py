@@ -0,0 +1,5 @@
+from config import parse as parse_config
+from _registry import ModelRegistry
+
+# one instance of every parse-side model per process, shared by all file types
+parse_models = ModelRegistry("parse", parse_config["memory_budget_mb"])
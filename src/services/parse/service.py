@@ -1,23 +1,65 @@
-import httpx
-from io import BytesIO
-from magika import Magika
+import json
+import traceback
 
 from .utils import (
     generate_filename_from_url,
     get_filename_from_cd,
+    get_magika,
+    sniff_bytes,
     TextProcessingPipeline,
 )
 
+from .text.pool import partition_pool
 from .text.service import TextParsingService
-from .audio.service import AudioParsingService
-from .image.service import ImageParsingService
-from .video.service import VideoParsingService
+from .audio.service import AudioParsingService, ParserFactory as AudioParsers
+from .image.service import ImageParsingService, ParserFactory as ImageParsers
+from .video.service import VideoParsingService, ParserFactory as VideoParsers
 
 
+from .cache import file_digest, make_key, parse_cache
 from .model import ParseFileRequest
 
-from _exceptions import BadRequestError
-from _utils import create_success_response
+from config import parse as parse_config
+from _exceptions import APIError, BadRequestError
+from _executor import executors
+from _spool import SpooledFile
+from _utils import create_success_response, download_file, new_spooled_file
+
+services = {
+    "text": TextParsingService,
+    "audio": AudioParsingService,
+    "image": ImageParsingService,
+    "video": VideoParsingService,
+}
+
+# load a parse model and run one dummy forward pass through it
+warmers = {
+    "audio": lambda: AudioParsers.get_parser("mp3").warmup(),
+    "image": lambda: ImageParsers.get_parser("png").warmup(),
+    "video": lambda: VideoParsers.get_parser("mp4").warmup(),
+    "keyphrase": lambda: TextProcessingPipeline().keyphrase_extractor("warmup"),
+    "summarizer": lambda: TextProcessingPipeline().summarizer(
+        "warmup", max_length=8, min_length=1
+    ),
+    "partition": partition_pool.warmup,
+}
+
+
+def get_stats():
+    return create_success_response(
+        {
+            "cache": parse_cache.stats() if parse_cache is not None else None,
+            "partition_pool": partition_pool.stats(),
+            "partition_executor": executors["parse_partition"].stats(),
+        }
+    )
+
+
+def warmup_tasks():
+    unknown = set(parse_config["preload_models"]) - set(warmers)
+    if unknown:
+        raise ValueError(f"Unknown PARSE_PRELOAD_MODELS: {', '.join(sorted(unknown))}")
+    return {f"parse:{name}": warmers[name] for name in parse_config["preload_models"]}
 
 
 class ParseHandler:
@@ -26,30 +68,26 @@ class ParseHandler:
         self.contents = contents
 
     async def download_file_to_memory(self):
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(self.file_url)
-                if response.status_code == 200:
-                    filename = get_filename_from_cd(
-                        response.headers.get("content-disposition")
-                    )
-                    if not filename:
-                        filename = generate_filename_from_url(self.file_url)
-
-                    return response.content, filename
-                else:
-                    raise BadRequestError(error={"message": "Error downloading file"})
-
-        except Exception as e:
-            raise BadRequestError(error={"message": "Error downloading file"})
+        if not self.file_url:
+            raise BadRequestError(error={"message": "file_url or contents is required"})
+        stream, headers = await download_file(self.file_url)
+        filename = get_filename_from_cd(headers.get("content-disposition"))
+        if not filename:
+            filename = generate_filename_from_url(self.file_url)
+        return stream, filename
 
     def download_text_to_memory(self):
-        return self.contents.encode("utf-8"), "file.txt"
+        stream = new_spooled_file(".txt")
+        stream.write(self.contents.encode("utf-8"))
+        stream.seek(0)
+        return stream, "file.txt"
 
-    def detect_filetype(self, contents):
+    def detect_filetype(self, stream: SpooledFile):
         try:
-            m = Magika()
-            res = m.identify_bytes(contents)
+            # a view of the file, only the sniffed blocks are copied
+            with stream.view() as view:
+                sample = sniff_bytes(view)
+            res = get_magika().identify_bytes(sample)
             data = {
                 "label": res.output.ct_label,
                 "mime_type": res.output.mime_type,
@@ -63,58 +101,145 @@ class ParseHandler:
 
     async def parse(self, modality: str, parser_request: ParseFileRequest):
         if parser_request.contents:
-            contents, filename = self.download_text_to_memory()
+            stream, filename = self.download_text_to_memory()
         else:
-            contents, filename = await self.download_file_to_memory()
+            stream, filename = await self.download_file_to_memory()
 
-        stream = BytesIO(contents)
-        metadata = self.detect_filetype(stream.getvalue())
-        metadata.update({"filename": filename})
-
-        if modality == "text":
-            text_service = TextParsingService(
-                file_stream=stream,
-                metadata=metadata,
-                parser_request=parser_request,
-            )
-            output = await text_service.parse()
-
-        elif modality == "audio":
-            audio_service = AudioParsingService(
-                file_stream=stream,
-                metadata=metadata,
-                parser_request=parser_request,
-            )
-            output = await audio_service.parse()
+        # parsers read the spooled file in place, it is deleted once parsed
+        with stream:
+            if parse_cache is None:
+                result = await self._parse(modality, parser_request, stream, filename)
+                return create_success_response(result)
 
-        elif modality == "image":
-            image_service = ImageParsingService(
-                file_stream=stream,
-                metadata=metadata,
-                parser_request=parser_request,
+            key, cached = await executors["parse_text"].run(
+                self.lookup_cache, modality, parser_request, stream
             )
-            output = await image_service.parse()
+            if cached is not None:
+                cached["metadata"]["filename"] = filename
+                return create_success_response(cached)
+
+            result = await self._parse(modality, parser_request, stream, filename)
+            await self._put_cache(key, result)
+            return create_success_response(result)
+
+    def lookup_cache(self, modality, parser_request, stream):
+        key = make_key(modality, file_digest(stream), parser_request)
+        return key, parse_cache.get(key)
+
+    async def parse_stream(self, modality: str, parser_request: ParseFileRequest):
+        """
+        Start parsing and return the response as an async iterator of NDJSON
+        lines: one {"output": ...} line per chunk (or piece of text) as soon as
+        the parser produces it, then a final {"metadata": ...} line.
+
+        Download and file type errors are raised here, before the response has
+        started; errors while parsing end the stream with an {"error": ...} line.
+
+        Cached results are replayed, but streamed results aren't cached: PDFs
+        are chunked per page batch when streamed, unlike the /parse output.
+        """
+        if parser_request.contents:
+            stream, filename = self.download_text_to_memory()
+        else:
+            stream, filename = await self.download_file_to_memory()
 
-        elif modality == "video":
-            video_service = VideoParsingService(
-                file_stream=stream,
-                metadata=metadata,
-                parser_request=parser_request,
-            )
-            output = await video_service.parse()
+        try:
+            if parse_cache is not None:
+                _, cached = await executors["parse_text"].run(
+                    self.lookup_cache, modality, parser_request, stream
+                )
+                if cached is not None:
+                    stream.close()
+                    cached["metadata"]["filename"] = filename
+                    return self._replay(cached)
+
+            metadata = await self._detect_metadata(stream, filename)
+            service = self._get_service(modality, parser_request, stream, metadata)
+            # admitted to its pool here, so a full pool is a 429 and not a stream
+            items = service.stream()
+        except BaseException:
+            stream.close()
+            raise
+        return self._stream(modality, parser_request, items, stream, metadata)
+
+    async def _replay(self, result):
+        output = result["output"]
+        for piece in output if isinstance(output, list) else [output]:
+            yield json.dumps({"output": piece}) + "\n"
+        yield json.dumps({"metadata": result["metadata"]}) + "\n"
+
+    async def _stream(self, modality, parser_request, items, stream, metadata):
+        pieces = []
+        with stream:
+            try:
+                async for piece in items:
+                    pieces.append(piece)
+                    yield json.dumps({"output": piece}) + "\n"
+
+                # the same output the non-streaming endpoint returns
+                if modality == "text" and not parser_request.should_chunk:
+                    output = " ".join(pieces)
+                else:
+                    output = pieces
+                await self._add_tags(output, metadata, parser_request)
+                yield json.dumps({"metadata": metadata}) + "\n"
+            except APIError as e:
+                yield json.dumps({"error": e.error}) + "\n"
+                return
+            except Exception:
+                # the response has started, so report it in the stream instead
+                traceback.print_exc()
+                error = {"message": "There was an error parsing the file"}
+                yield json.dumps({"error": error}) + "\n"
+                return
+
+    async def _put_cache(self, key, result):
+        # the filename comes from the request, not the file contents
+        metadata = {k: v for k, v in result["metadata"].items() if k != "filename"}
+        await executors["parse_text"].run(
+            parse_cache.put, key, {**result, "metadata": metadata}
+        )
+
+    async def _detect_metadata(self, stream: SpooledFile, filename: str):
+        metadata = await executors["parse_text"].run(self.detect_filetype, stream)
+        metadata.update({"filename": filename})
+        return metadata
 
-        else:
+    def _get_service(self, modality, parser_request, stream, metadata):
+        service = services.get(modality)
+        if service is None:
             raise BadRequestError(error="Modality not supported")
+        return service(
+            file_stream=stream,
+            metadata=metadata,
+            parser_request=parser_request,
+        )
 
+    async def _add_tags(self, output, metadata, parser_request):
         pipeline = TextProcessingPipeline()
 
         # additional params to process
         if parser_request.extract_tags:
-            tags = await pipeline.extract_tags(output, "text")
+            tags = await executors["parse_text"].run(
+                pipeline.extract_tags, output, "text"
+            )
             metadata.update({"tags": tags})
 
         # if parser_request.summarize:
-        #     summary = await pipeline.summarize(output, "text")
+        #     summary = await executors["parse_text"].run(
+        #         pipeline.summarize, output, "text"
+        #     )
         #     metadata.update({"summary": summary})
 
-        return create_success_response({"output": output, "metadata": metadata})
+    async def _parse(
+        self,
+        modality: str,
+        parser_request: ParseFileRequest,
+        stream: SpooledFile,
+        filename: str,
+    ):
+        metadata = await self._detect_metadata(stream, filename)
+        service = self._get_service(modality, parser_request, stream, metadata)
+        output = await service.parse()
+        await self._add_tags(output, metadata, parser_request)
+        return {"output": output, "metadata": metadata}
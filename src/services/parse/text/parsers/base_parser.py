@@ -1,13 +1,141 @@
+import re
 from abc import ABC, abstractmethod
-from io import BytesIO
-from typing import Union, Dict, List
+from typing import Callable, Iterable, Iterator, Union, Dict, List
 
+from unstructured.chunking.basic import chunk_elements
+from unstructured.cleaners.core import clean_bullets, clean_trailing_punctuation
+from unstructured.documents.elements import Element, ElementMetadata
+
+from ..pool import partition_pool
 from parse.model import ParseFileRequest
+from _exceptions import InternalServerError
+from _spool import SpooledFile
 
 
 class ParserInterface(ABC):
     @abstractmethod
     def parse(
-        self, file_stream: BytesIO, params: ParseFileRequest
+        self, file_stream: SpooledFile, params: ParseFileRequest
     ) -> Union[List[Dict], str]:
         pass
+
+
+# dashes, non-breaking spaces and newlines all become spaces
+_to_space = re.compile(r"[-\u2013\xa0\n]")
+_repeated_spaces = re.compile(r"[ ]{2,}")
+# chunk_elements joins element text with a blank line, which cleaning turns
+# into a space, or into nothing before punctuation
+_separator_before_punctuation = re.compile(r"\n\n(?=[.,;:!?])")
+_element_separator = re.compile(r"\n\n")
+
+
+def _clean_text(text: str) -> str:
+    # clean(extra_whitespace=True, dashes=True, bullets=True) in two passes of
+    # precompiled patterns instead of four, since it now runs once per element
+    text = _repeated_spaces.sub(" ", _to_space.sub(" ", text)).strip()
+    return clean_bullets(text)
+
+
+def _chunk_text(chunk: Element, params: ParseFileRequest) -> str:
+    text = chunk.text
+    if params.clean_text:
+        # cleaned elements have no newlines left, only the separators
+        text = _separator_before_punctuation.sub("", text)
+        text = clean_trailing_punctuation(_element_separator.sub(" ", text))
+    return text
+
+
+def _metadata_dict(metadata: ElementMetadata) -> Dict:
+    # ElementMetadata.to_dict without its deepcopy, the chunk is dropped right after
+    metadata_dict = {
+        name: value
+        for name, value in metadata.fields.items()
+        if value != [] and value != {}
+    }
+    if metadata.coordinates is not None:
+        metadata_dict["coordinates"] = metadata.coordinates.to_dict()
+    if metadata.data_source is not None:
+        metadata_dict["data_source"] = metadata.data_source.to_dict()
+    return metadata_dict
+
+
+class UnstructuredParser(ParserInterface):
+    """
+    Partitions a file with unstructured and turns the elements into output in
+    a single pass shared by every text parser.
+
+    Element text is cleaned in place before chunking and each chunk becomes
+    exactly one output dict. When not chunking, the text of the chunks is
+    joined instead, so trailing punctuation is stripped at the same places.
+    """
+
+    # key of the partitioner in pool.partitioners and prefix of its settings
+    file_type: str
+    # name of the file type in error messages
+    label: str
+
+    def parse(
+        self, file_stream: SpooledFile, params: ParseFileRequest
+    ) -> Union[List[Dict], str]:
+        # every element is chunked together, chunks can span iter_elements batches
+        output = list(
+            self._output(lambda: [self.partition(file_stream, params)], params)
+        )
+        if params.should_chunk:
+            return output
+        else:
+            return " ".join(output)
+
+    def iter_output(
+        self, file_stream: SpooledFile, params: ParseFileRequest
+    ) -> Iterator[Union[Dict, str]]:
+        """Yield chunks (or text when not chunking) for each batch of elements."""
+        return self._output(lambda: self.iter_elements(file_stream, params), params)
+
+    def partition(
+        self, file_stream: SpooledFile, params: ParseFileRequest
+    ) -> List[Element]:
+        settings = getattr(params, f"{self.file_type}_settings")
+        return partition_pool.partition(self.file_type, file_stream.path, settings)
+
+    def iter_elements(
+        self, file_stream: SpooledFile, params: ParseFileRequest
+    ) -> Iterator[List[Element]]:
+        # a single batch, unless the parser can partition part of a file
+        yield self.partition(file_stream, params)
+
+    def _output(
+        self, batches: Callable[[], Iterable[List[Element]]], params: ParseFileRequest
+    ) -> Iterator[Union[Dict, str]]:
+        try:
+            for elements in batches():
+                yield from self._postprocess(elements, params)
+        except Exception as e:
+            raise InternalServerError(
+                error=f"Failed to parse {self.label}. Please try again. If the issue persists, contact support."
+            )
+
+    def _postprocess(
+        self, elements: List[Element], params: ParseFileRequest
+    ) -> Iterator[Union[Dict, str]]:
+        if params.clean_text:
+            for element in elements:
+                if getattr(element, "text", None):
+                    element.text = _clean_text(element.text)
+
+        chunks = chunk_elements(
+            elements=elements, max_characters=params.max_characters_per_chunk
+        )
+        if not params.should_chunk:
+            text = " ".join(_chunk_text(chunk, params) for chunk in chunks)
+            if text:
+                yield text
+            return
+
+        for chunk in chunks:
+            yield {
+                "type": chunk.category,
+                "element_id": chunk.id,
+                "text": _chunk_text(chunk, params),
+                "metadata": _metadata_dict(chunk.metadata),
+            }
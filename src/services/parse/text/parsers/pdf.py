@@ -1,52 +1,26 @@
-from io import BytesIO
-from typing import Union, Dict, List
-from unstructured.partition.pdf import partition_pdf
-from unstructured.chunking.basic import chunk_elements
-from unstructured.cleaners.core import clean
-
-from .base_parser import ParserInterface
-from parse.model import ParseFileRequest
-from _exceptions import InternalServerError
+from typing import Iterator, List
 
+from unstructured.documents.elements import Element
 
-class PDFParser(ParserInterface):
-
-    def parse(
-        self, file_stream: BytesIO, params: ParseFileRequest
-    ) -> Union[List[Dict], str]:
-        try:
-            elements = partition_pdf(
-                file=file_stream,
-                **params.pdf_settings
-            )
-            chunks = chunk_elements(
-                elements=elements,
-                max_characters=params.max_characters_per_chunk,
-            )
-            chunks_dict = [chunk.to_dict() for chunk in chunks]
+from .base_parser import UnstructuredParser
+from ..pool import partition_pool
+from parse.model import ParseFileRequest
+from _spool import SpooledFile
 
-            if params.clean_text:
-                chunks_dict = [
-                    {**c, "text": self._clean_chunk_text(c["text"])}
-                    for c in chunks_dict
-                ]
 
-            if params.should_chunk:
-                return chunks_dict
-            else:
-                combined_text = " ".join([c["text"] for c in chunks_dict])
-                return combined_text
+class PDFParser(UnstructuredParser):
+    file_type = "pdf"
+    label = "PDF"
 
-        except Exception as e:
-            raise InternalServerError(
-                error="Failed to parse PDF. Please try again. If the issue persists, contact support."
-            )
+    def partition(
+        self, file_stream: SpooledFile, params: ParseFileRequest
+    ) -> List[Element]:
+        return partition_pool.partition_pdf(file_stream.path, params.pdf_settings)
 
-    def _clean_chunk_text(self, text: str) -> str:
-        return clean(
-            text=text,
-            extra_whitespace=True,
-            dashes=True,
-            bullets=True,
-            trailing_punctuation=True,
+    def iter_elements(
+        self, file_stream: SpooledFile, params: ParseFileRequest
+    ) -> Iterator[List[Element]]:
+        # one page batch at a time, so a streamed chunk never spans two batches
+        yield from partition_pool.iter_partition_pdf(
+            file_stream.path, params.pdf_settings
         )
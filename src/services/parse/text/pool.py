@@ -0,0 +1,265 @@
+import importlib
+import logging
+import multiprocessing
+import queue
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from pypdf import PdfReader, PdfWriter
+
+from config import parse as parse_config
+from config import executors as executor_config
+from _exceptions import InternalServerError
+
+log = logging.getLogger(__name__)
+
+# file type -> (module, function) of the unstructured partitioner
+partitioners = {
+    "pdf": ("unstructured.partition.pdf", "partition_pdf"),
+    "html": ("unstructured.partition.html", "partition_html"),
+    "csv": ("unstructured.partition.csv", "partition_csv"),
+    "xlsx": ("unstructured.partition.xlsx", "partition_xlsx"),
+    "ppt": ("unstructured.partition.ppt", "partition_ppt"),
+    "pptx": ("unstructured.partition.pptx", "partition_pptx"),
+    "txt": ("unstructured.partition.text", "partition_text"),
+}
+
+
+def _init_worker():
+    # pay for the unstructured imports once per worker rather than per job;
+    # layout models are loaded by the first hi_res job and stay cached after it
+    for module, _ in partitioners.values():
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            log.warning("%s is not available in partition workers", module)
+
+
+def _partition(file_type, path, settings):
+    module, function = partitioners[file_type]
+    partition = getattr(importlib.import_module(module), function)
+    elements = partition(filename=path, **settings)
+    # the spooled temp file is an implementation detail, keep the metadata the
+    # same as when partitioning a file object
+    for element in elements:
+        element.metadata.filename = None
+        element.metadata.file_directory = None
+        element.metadata.last_modified = None
+    return elements
+
+
+def _partition_pdf_pages(path, start, stop, settings):
+    # each worker cuts its own page range out of the shared file
+    reader = PdfReader(path)
+    writer = PdfWriter()
+    for page in reader.pages[start:stop]:
+        writer.add_page(page)
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as range_file:
+        writer.write(range_file)
+        range_file.flush()
+        elements = _partition("pdf", range_file.name, settings)
+    for element in elements:
+        if element.metadata.page_number is not None:
+            element.metadata.page_number += start
+    return elements
+
+
+def page_ranges(page_count, parts):
+    # contiguous ranges whose sizes differ by at most one page
+    bounds = [page_count * part // parts for part in range(parts + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+
+def _ready():
+    return True
+
+
+class _Worker:
+    """
+    A single worker process, so a hung job can be killed without taking the
+    jobs running in the other workers down with it.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._started = None
+
+    def start(self):
+        if self._executor is None:
+            # spawn rather than fork, the parent holds torch and onnxruntime threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            self._started = self._executor.submit(_ready)
+        return self._started
+
+    def submit(self, function, *args):
+        # a new process is started first, so its startup isn't timed with the job
+        self.start().result()
+        return self._executor.submit(function, *args)
+
+    def kill(self):
+        # the next job starts a fresh process
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        for process in list(executor._processes.values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PartitionPool:
+    """
+    Runs unstructured partitioners in a pool of warm worker processes.
+
+    Jobs receive the path of the spooled download, never the file bytes, and
+    only the resulting elements are pickled back. Each job is handed to an
+    idle worker, so ``timeout`` counts from when it starts running rather than
+    from when it was queued. A job that runs past it is abandoned and only its
+    worker is killed and replaced, since a worker stuck inside a partitioner
+    can't be interrupted any other way.
+    """
+
+    def __init__(self, max_workers: int, timeout: float):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.completed = 0
+        self.timeouts = 0
+        self.recycles = 0
+        self._running = 0
+        self._lock = threading.Lock()
+        self._idle = queue.SimpleQueue()
+        for _ in range(max_workers):
+            self._idle.put(_Worker())
+        # one thread per worker hands jobs out and waits on their results
+        self._dispatch = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="partition_dispatch"
+        )
+
+    def warmup(self):
+        # start every worker so the first requests don't pay for spawning
+        workers = [self._idle.get() for _ in range(self.max_workers)]
+        try:
+            futures = [worker.start() for worker in workers]
+            for future in futures:
+                future.result()
+        finally:
+            for worker in workers:
+                self._idle.put(worker)
+
+    def _run_job(self, function, args):
+        worker = self._idle.get()
+        try:
+            # the worker is idle, so the job starts running right away
+            future = worker.submit(function, *args)
+            result = future.result(timeout=self.timeout)
+        except TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+                self.recycles += 1
+            log.warning(
+                "partitioning timed out after %ss, recycling its worker", self.timeout
+            )
+            worker.kill()
+            raise InternalServerError(
+                error={"message": f"Parsing timed out after {self.timeout}s"}
+            )
+        except BrokenProcessPool:
+            with self._lock:
+                self.recycles += 1
+            worker.kill()
+            raise InternalServerError(
+                error={"message": "Parsing worker exited unexpectedly"}
+            )
+        finally:
+            self._idle.put(worker)
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def _job_done(self, _future):
+        with self._lock:
+            self._running -= 1
+
+    def _iter_run(self, jobs):
+        """Run (function, args) jobs concurrently, yielding results in job order."""
+        with self._lock:
+            self._running += len(jobs)
+        futures = []
+        for function, args in jobs:
+            future = self._dispatch.submit(self._run_job, function, args)
+            future.add_done_callback(self._job_done)
+            futures.append(future)
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            # jobs that haven't started yet are dropped with the consumer
+            for future in futures:
+                future.cancel()
+
+    def partition(self, file_type: str, path: str, settings: dict):
+        # unpacking runs the generator to the end, releasing the job
+        [elements] = self._iter_run([(_partition, (file_type, path, settings))])
+        return elements
+
+    def partition_pdf(self, path: str, settings: dict):
+        """
+        Partition a PDF, splitting it when it has at least
+        ``pdf_split_threshold`` pages into page ranges that are partitioned
+        concurrently, with page numbers offset to their position in the
+        original document.
+        """
+        page_count = len(PdfReader(path).pages)
+        parts = min(parse_config["pdf_split_workers"], page_count)
+        if page_count < parse_config["pdf_split_threshold"] or parts < 2:
+            return self.partition("pdf", path, settings)
+
+        jobs = [
+            (_partition_pdf_pages, (path, start, stop, settings))
+            for start, stop in page_ranges(page_count, parts)
+        ]
+        return [element for elements in self._iter_run(jobs) for element in elements]
+
+    def iter_partition_pdf(self, path: str, settings: dict):
+        """
+        Partition a PDF in batches of ``pdf_stream_pages`` pages, yielding the
+        elements of each batch in page order as soon as it and every batch
+        before it are done. Batches are submitted together, so as many run at
+        once as there are free workers.
+        """
+        page_count = len(PdfReader(path).pages)
+        batch = max(1, parse_config["pdf_stream_pages"])
+        if page_count <= batch:
+            yield self.partition("pdf", path, settings)
+            return
+
+        jobs = [
+            (
+                _partition_pdf_pages,
+                (path, start, min(start + batch, page_count), settings),
+            )
+            for start in range(0, page_count, batch)
+        ]
+        yield from self._iter_run(jobs)
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "running": self._running,
+            # above 1 means jobs are waiting for a free worker
+            "saturation": round(self._running / self.max_workers, 2),
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "recycles": self.recycles,
+        }
+
+
+partition_pool = PartitionPool(
+    max_workers=executor_config["parse_partition"]["max_workers"],
+    timeout=parse_config["partition_timeout"],
+)
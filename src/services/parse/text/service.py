@@ -1,4 +1,5 @@
 from ..model import ParseFileRequest
+from ..utils import iter_parser_output
 from .parsers.base_parser import ParserInterface
 from .parsers.pdf import PDFParser
 from .parsers.html import HTMLParser
@@ -8,9 +9,10 @@ from .parsers.ppt import PPTParser
 from .parsers.pptx import PPTXParser
 from .parsers.txt import TextParser
 
-from io import BytesIO
-from typing import Union, List, Dict
+from typing import AsyncIterator, Union, List, Dict
 from _exceptions import BadRequestError
+from _executor import executors
+from _spool import SpooledFile
 
 
 class ParserFactory:
@@ -33,7 +35,7 @@ class ParserFactory:
 
 class TextParsingService:
     def __init__(
-        self, file_stream: BytesIO, metadata: dict, parser_request: ParseFileRequest
+        self, file_stream: SpooledFile, metadata: dict, parser_request: ParseFileRequest
     ):
         self.file_stream = file_stream
         self.file_ext = metadata["label"]
@@ -41,8 +43,19 @@ class TextParsingService:
         self.parser_request = parser_request
 
     async def parse(self) -> Union[List[Dict], str]:
+        # the thread only waits on a partition worker process, see pool.py
+        return await executors["parse_partition"].run(self._parse)
+
+    def _parse(self) -> Union[List[Dict], str]:
         parser = ParserFactory.get_parser(self.file_ext)
         return parser.parse(
             file_stream=self.file_stream,
             params=self.parser_request,
         )
+
+    def stream(self) -> AsyncIterator[Union[Dict, str]]:
+        return executors["parse_partition"].iterate(self._iter_output)
+
+    def _iter_output(self):
+        parser = ParserFactory.get_parser(self.file_ext)
+        return iter_parser_output(parser, self.file_stream, self.parser_request)
@@ -1,5 +1,8 @@
 from urllib.parse import urlparse, unquote
 import os
+import threading
+
+from magika import Magika
 
 from transformers import (
     AutoModelForTokenClassification,
@@ -11,6 +14,80 @@ from transformers import (
 from transformers.pipelines import AggregationStrategy
 import numpy as np
 
+from .registry import parse_models
+
+KEYPHRASE_MODEL = "ml6team/keyphrase-extraction-kbir-inspec"
+SUMMARIZATION_MODEL = "facebook/bart-large-cnn"
+
+# Magika reads at most the first, middle and last 512 bytes of a file, from
+# 4096 byte blocks so leading and trailing whitespace can be stripped
+SNIFF_BLOCK_SIZE = 4096
+# leading and trailing whitespace is looked through up to this far
+SNIFF_SCAN_LIMIT = 1024 * 1024
+
+_magika = None
+_magika_lock = threading.Lock()
+
+
+def get_magika():
+    """
+    Process-wide Magika instance, its ONNX model is loaded on first use.
+    """
+    global _magika
+    if _magika is None:
+        with _magika_lock:
+            if _magika is None:
+                _magika = Magika()
+    return _magika
+
+
+def _content_bounds(view):
+    # Magika strips leading and trailing whitespace before taking its features
+    size = len(view)
+    start = 0
+    while start < min(size, SNIFF_SCAN_LIMIT):
+        block = bytes(view[start : start + SNIFF_BLOCK_SIZE])
+        content = block.lstrip()
+        start += len(block) - len(content)
+        if content:
+            break
+    end = size
+    while end > start and size - end < SNIFF_SCAN_LIMIT:
+        block = bytes(view[max(start, end - SNIFF_BLOCK_SIZE) : end])
+        content = block.rstrip()
+        end -= len(block) - len(content)
+        if content:
+            break
+    return start, end
+
+
+def sniff_bytes(view):
+    """
+    Head, middle and tail blocks of a buffer without its leading and trailing
+    whitespace, laid out so that Magika's beginning, middle and end features
+    match those of the full file.
+
+    Whitespace runs longer than ``SNIFF_SCAN_LIMIT`` are only skipped that far,
+    Magika strips what is left of them from the sample itself.
+    """
+    size = len(view)
+    if size <= 3 * SNIFF_BLOCK_SIZE:
+        return bytes(view)
+    start, end = _content_bounds(view)
+    if start == end:
+        # only whitespace, which Magika labels by the bytes themselves
+        return bytes(view[:SNIFF_BLOCK_SIZE])
+    if end - start <= 3 * SNIFF_BLOCK_SIZE:
+        return bytes(view[start:end])
+    mid = start + (end - start - SNIFF_BLOCK_SIZE) // 2
+    return b"".join(
+        [
+            view[start : start + SNIFF_BLOCK_SIZE],
+            view[mid : mid + SNIFF_BLOCK_SIZE],
+            view[end - SNIFF_BLOCK_SIZE : end],
+        ]
+    )
+
 
 def get_filename_from_cd(cd):
     """
@@ -32,19 +109,42 @@ def generate_filename_from_url(url):
     return os.path.basename(parsed_url.path)
 
 
+def iter_parser_output(parser, file_stream, params):
+    """
+    Yield a parser's output piece by piece.
+
+    Parsers that can produce their output incrementally implement
+    ``iter_output``; the rest are run to completion and their chunks (or text)
+    are yielded once they are done.
+    """
+    if hasattr(parser, "iter_output"):
+        yield from parser.iter_output(file_stream, params)
+        return
+    output = parser.parse(file_stream=file_stream, params=params)
+    if isinstance(output, list):
+        yield from output
+    else:
+        yield output
+
+
 class TextProcessingPipeline:
     """
     A pipeline for processing text, including extracting key phrases and summarizing text.
     """
 
-    def __init__(self):
-        """
-        Initializes the TextProcessingPipeline.
-        """
-        self.keyphrase_extractor = None
-        self.summarizer = None
+    @property
+    def keyphrase_extractor(self):
+        return parse_models.get(
+            "keyphrase", lambda: KeyphraseExtractionPipeline(model=KEYPHRASE_MODEL)
+        )
+
+    @property
+    def summarizer(self):
+        return parse_models.get(
+            "summarizer", lambda: pipeline("summarization", model=SUMMARIZATION_MODEL)
+        )
 
-    async def extract_tags(self, response_list, key):
+    def extract_tags(self, response_list, key):
         """
         Extracts key phrases from a list of responses.
 
@@ -55,11 +155,6 @@ class TextProcessingPipeline:
         Returns:
             list: A list of key phrases.
         """
-        # Initialize the keyphrase extractor if it hasn't been initialized yet
-        if self.keyphrase_extractor is None:
-            model_name = "ml6team/keyphrase-extraction-kbir-inspec"
-            self.keyphrase_extractor = KeyphraseExtractionPipeline(model=model_name)
-
         # Combine all the responses into a single string
         massive_text = " ".join([response.get(key, "") for response in response_list])
 
@@ -68,7 +163,7 @@ class TextProcessingPipeline:
 
         return tags.tolist()
 
-    async def summarize(self, response_list, key):
+    def summarize(self, response_list, key):
         """
         Summarizes a list of responses.
 
@@ -79,10 +174,6 @@ class TextProcessingPipeline:
         Returns:
             str: The summarized text.
         """
-        # Initialize the summarizer if it hasn't been initialized yet
-        if self.summarizer is None:
-            self.summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-
         # Combine all the responses into a single string
         massive_text = " ".join([response.get(key, "") for response in response_list])
 
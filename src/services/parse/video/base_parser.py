@@ -1,20 +1,15 @@
 import cv2
 import torch
-from transformers import DetrForObjectDetection, DetrFeatureExtractor, pipeline
+from transformers import DetrForObjectDetection, DetrFeatureExtractor
 from typing import List, Dict, Union
 import numpy as np
-from io import BytesIO
-import tempfile
+
+from _spool import SpooledFile
 
 
 class VideoParser:
     def __init__(self):
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-
-    def parse(self, file_stream: BytesIO, params: Dict) -> Union[List[Dict], str]:
-        interval = params.get("interval", 5)  # Default interval length of 5 seconds
-
-        # Initialize models based on provided params
         self.object_detector = DetrForObjectDetection.from_pretrained(
             "facebook/detr-resnet-50"
         ).to(self.device)
@@ -22,14 +17,17 @@ class VideoParser:
             "facebook/detr-resnet-50"
         )
 
-        self.keyword_extractor = pipeline(
-            "feature-extraction",
-            model="distilbert-base-uncased",
-            device=0 if torch.cuda.is_available() else -1,
-        )
+    def warmup(self):
+        frame = np.zeros((224, 224, 3), dtype=np.uint8)
+        inputs = self.feature_extractor(frame, return_tensors="pt").to(self.device)
+        with torch.no_grad():
+            self.object_detector(**inputs)
+
+    def parse(self, file_stream: SpooledFile, params: Dict) -> Union[List[Dict], str]:
+        interval = params.get("interval", 5)  # Default interval length of 5 seconds
 
-        # Process video
-        video_path = self._save_temp_video(file_stream)
+        # Process video, OpenCV reads the spooled download from disk in place
+        video_path = file_stream.path
         chunks_results = []
         for frames in self._chunk_video(video_path, interval):
             object_detections = self._detect_objects(frames)
@@ -45,13 +43,6 @@ class VideoParser:
 
         return chunks_results
 
-    def _save_temp_video(self, file_stream: BytesIO) -> str:
-        # Create a temporary file with a suffix '.mp4' to indicate the file type
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as tmp_video:
-            tmp_video.write(file_stream.read())
-            # Return the name of the temporary file
-            return tmp_video.name
-
     def _chunk_video(self, video_path: str, interval: int) -> List[np.ndarray]:
         cap = cv2.VideoCapture(video_path)
         fps = int(cap.get(cv2.CAP_PROP_FPS))
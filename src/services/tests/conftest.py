@@ -0,0 +1,61 @@
+import os
+import random
+import sys
+
+import pytest
+import torch
+from transformers import BertConfig, BertModel, BertTokenizerFast
+
+# the services modules import each other from the app directory, as under uvicorn
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embed.cache import EmbeddingCache  # noqa: E402
+from embed.text.service import TextEmbeddingService  # noqa: E402
+
+WORDS = (
+    "the contract shall terminate upon written notice by either party revenue "
+    "increased quarter over quarter driven by subscription growth in europe"
+).split()
+
+
+@pytest.fixture(scope="session")
+def text_service(tmp_path_factory):
+    """
+    TextEmbeddingService over a tiny randomly initialized BERT, so embedding
+    tests run offline and in milliseconds. Its cache is private to the test.
+    """
+    vocab = tmp_path_factory.mktemp("tokenizer") / "vocab.txt"
+    special = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+    vocab.write_text("\n".join(special + sorted(set(WORDS))))
+    tokenizer = BertTokenizerFast(vocab_file=str(vocab), model_max_length=32)
+
+    torch.manual_seed(0)
+    config = BertConfig(
+        vocab_size=tokenizer.vocab_size,
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=32,
+    )
+    model = BertModel(config).eval()
+
+    service = TextEmbeddingService.__new__(TextEmbeddingService)
+    service.model_name = "tiny-bert"
+    service.cache = EmbeddingCache(max_entries=1000)
+    service.bucket_size = 4
+    service.max_windows = 3
+    service.device = torch.device("cpu")
+    service.tokenizer = tokenizer
+    service.model = model
+    service.config = config
+    return service
+
+
+@pytest.fixture
+def sentences():
+    rng = random.Random(0)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 25)))
+        for _ in range(11)
+    ]
@@ -0,0 +1,22 @@
+import torch
+
+
+def test_bucketed_output_equals_unbucketed(text_service, sentences):
+    # more inputs than one bucket, of very different lengths
+    assert len(sentences) > text_service.bucket_size
+    bucketed = text_service._encode(sentences, bucketed=True)
+    unbucketed = text_service._encode(sentences, bucketed=False)
+    torch.testing.assert_close(bucketed, unbucketed)
+
+
+def test_bucketed_output_keeps_input_order(text_service, sentences):
+    reordered = sentences[::-1]
+    forward = text_service._encode(sentences)
+    backward = text_service._encode(reordered)
+    torch.testing.assert_close(forward, backward.flip(0))
+
+
+def test_each_input_matches_encoding_it_alone(text_service, sentences):
+    bucketed = text_service._encode(sentences)
+    for i, sentence in enumerate(sentences):
+        torch.testing.assert_close(bucketed[i], text_service._encode([sentence])[0])
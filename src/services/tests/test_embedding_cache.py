@@ -0,0 +1,66 @@
+import numpy as np
+import torch
+
+from embed.cache import EmbeddingCache
+
+
+def vectors(count, dimensions=8, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, dimensions))
+
+
+def test_hit_returns_the_stored_vector():
+    cache = EmbeddingCache(max_entries=10)
+    keys = [cache.make_key("model", text) for text in ["a", "b"]]
+    stored = vectors(2)
+    cache.put_many(keys, stored)
+
+    hits = cache.get_many(keys + [cache.make_key("model", "c")])
+    np.testing.assert_array_equal(np.stack(hits[:2]), stored.astype("<f4"))
+    assert hits[2] is None
+    assert cache.stats()["memory_hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_keys_depend_on_namespace_and_text():
+    make_key = EmbeddingCache.make_key
+    assert make_key("model", "text") == make_key("model", "text")
+    assert make_key("model", "text") != make_key("model", "text ")
+    assert make_key("model", "text") != make_key("other", "text")
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put_many(["a", "b"], vectors(2))
+    cache.get_many(["a"])
+    cache.put_many(["c"], vectors(1, seed=1))
+    assert [vector is None for vector in cache.get_many(["a", "b", "c"])] == [
+        False,
+        True,
+        False,
+    ]
+
+
+def test_disk_tier_survives_eviction_and_restart(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    stored = vectors(3)
+    cache = EmbeddingCache(max_entries=1, path=path)
+    cache.put_many(["a", "b", "c"], stored)
+
+    # "a" and "b" were evicted from memory but are still on disk
+    np.testing.assert_array_equal(cache.get_many(["a"])[0], stored[0].astype("<f4"))
+    assert cache.stats()["disk_hits"] == 1
+
+    restarted = EmbeddingCache(max_entries=10, path=path)
+    hits = restarted.get_many(["a", "b", "c"])
+    np.testing.assert_array_equal(np.stack(hits), stored.astype("<f4"))
+
+
+def test_cached_encode_equals_recompute(text_service, sentences):
+    first = text_service.encode(sentences)
+    hits = text_service.cache.stats()["memory_hits"]
+    second = text_service.encode(sentences)
+    assert text_service.cache.stats()["memory_hits"] == hits + len(sentences)
+
+    recomputed = text_service._encode(sentences)
+    torch.testing.assert_close(first, recomputed)
+    torch.testing.assert_close(second, recomputed)
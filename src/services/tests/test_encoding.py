@@ -0,0 +1,33 @@
+import base64
+
+import numpy as np
+import pytest
+
+from embed.encoding import encode_vector, encode_vectors
+
+VECTOR = np.array([0.5, -1.25, 3.0, 1e-3], dtype=np.float32)
+
+
+def test_float_is_a_json_list():
+    assert encode_vector(VECTOR) == VECTOR.tolist()
+
+
+@pytest.mark.parametrize(
+    "encoding, dtype", [("base64-float32", "<f4"), ("base64-float16", "<f2")]
+)
+def test_base64_round_trips_through_frombuffer(encoding, dtype):
+    vectors = np.random.default_rng(0).standard_normal((3, 384)).astype(np.float32)
+    for encoded, vector in zip(encode_vectors(vectors, encoding), vectors):
+        decoded = np.frombuffer(base64.b64decode(encoded), dtype=dtype)
+        np.testing.assert_array_equal(decoded, vector.astype(dtype))
+
+
+def test_base64_float32_is_little_endian():
+    # the wire format doesn't depend on the byte order of the server
+    encoded = encode_vector(VECTOR.astype(">f4"), "base64-float32")
+    assert base64.b64decode(encoded) == VECTOR.astype("<f4").tobytes()
+
+
+def test_unknown_encoding_is_rejected():
+    with pytest.raises(ValueError):
+        encode_vector(VECTOR, "base64-int8")
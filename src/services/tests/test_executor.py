@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+import torch
+
+import _executor
+from _executor import BoundedExecutor, _intra_op_threads
+from config import executors as executor_config
+
+
+@pytest.mark.parametrize("cpu_count", [1, 4, 6, 16, 64])
+def test_model_pools_share_one_core_budget(monkeypatch, cpu_count):
+    monkeypatch.setattr(_executor, "torch_threads_per_worker", 0)
+    monkeypatch.setattr(_executor.os, "cpu_count", lambda: cpu_count)
+    threads = {name: _intra_op_threads(pool) for name, pool in executor_config.items()}
+
+    assert threads["parse_text"] is None
+    assert threads["parse_partition"] is None
+    total = sum(
+        pool["max_workers"] * threads[name]
+        for name, pool in executor_config.items()
+        if pool["runs_models"]
+    )
+    workers = sum(
+        pool["max_workers"] for pool in executor_config.values() if pool["runs_models"]
+    )
+    assert total <= max(cpu_count, workers)
+
+
+def test_pool_setting_overrides_the_budget(monkeypatch):
+    monkeypatch.setitem(executor_config["embed"], "torch_threads", 3)
+    assert _intra_op_threads(executor_config["embed"]) == 3
+
+
+def test_jobs_run_with_the_pool_thread_count():
+    pool = BoundedExecutor("test", max_workers=1, max_queue=0, intra_op_threads=2)
+    previous = torch.get_num_threads()
+    try:
+        assert asyncio.run(pool.run(torch.get_num_threads)) == 2
+    finally:
+        torch.set_num_threads(previous)
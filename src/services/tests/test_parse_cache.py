@@ -0,0 +1,111 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+import parse.service as parse_service
+from parse.cache import ParseCache, make_key
+from parse.model import ParseFileRequest
+from parse.service import ParseHandler
+
+DIGEST = "0" * 64
+
+
+def test_key_ignores_where_the_input_came_from():
+    by_url = ParseFileRequest(file_url="https://example.com/a.pdf")
+    by_contents = ParseFileRequest(contents="hello")
+    assert make_key("text", DIGEST, by_url) == make_key("text", DIGEST, by_contents)
+
+
+@pytest.mark.parametrize(
+    "changed",
+    [
+        {"should_chunk": False},
+        {"clean_text": False},
+        {"max_characters_per_chunk": 200},
+        {"pdf_settings": {"strategy": "hi_res"}},
+    ],
+)
+def test_key_changes_with_parse_settings(changed):
+    assert make_key("text", DIGEST, ParseFileRequest()) != make_key(
+        "text", DIGEST, ParseFileRequest(**changed)
+    )
+
+
+def test_key_changes_with_modality_and_content():
+    key = make_key("text", DIGEST, ParseFileRequest())
+    assert key != make_key("image", DIGEST, ParseFileRequest())
+    assert key != make_key("text", "1" * 64, ParseFileRequest())
+
+
+def test_get_returns_what_was_put(tmp_path):
+    cache = ParseCache(str(tmp_path), max_bytes=1024 * 1024)
+    result = {"output": [{"text": "a"}], "metadata": {"label": "txt"}}
+    assert cache.get("key") is None
+    cache.put("key", result)
+    assert cache.get("key") == result
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    result = {"output": "x" * 100, "metadata": {}}
+    size = len(json.dumps(result))
+    cache = ParseCache(str(tmp_path), max_bytes=2 * size)
+    cache.put("a", result)
+    cache.put("b", result)
+    # "a" was read last, so "b" goes first
+    os.utime(tmp_path / "b.json", (1, 1))
+    cache.get("a")
+    cache.put("c", result)
+    assert cache.get("b") is None
+    assert cache.get("a") == result
+    assert cache.get("c") == result
+    assert cache.stats()["bytes"] <= 2 * size
+
+
+class CountingService:
+    calls = 0
+
+    def __init__(self, file_stream, metadata, parser_request):
+        self.file_stream = file_stream
+
+    async def parse(self):
+        CountingService.calls += 1
+        text = self.file_stream.read().decode("utf-8")
+        return [{"text": word} for word in text.split()]
+
+
+@pytest.fixture
+def handler(monkeypatch, tmp_path):
+    CountingService.calls = 0
+    monkeypatch.setitem(parse_service.services, "text", CountingService)
+    monkeypatch.setattr(
+        parse_service, "parse_cache", ParseCache(str(tmp_path), 1024 * 1024)
+    )
+
+    def parse(**settings):
+        request = ParseFileRequest(contents="cached parse results", **settings)
+        response = asyncio.run(
+            ParseHandler(file_url=None, contents=request.contents).parse(
+                "text", request
+            )
+        )
+        return json.loads(response.body)
+
+    return parse
+
+
+def test_cache_hit_equals_recompute(handler):
+    computed = handler()
+    cached = handler()
+    assert CountingService.calls == 1
+    assert cached == computed
+    assert cached["response"]["metadata"]["filename"] == "file.txt"
+
+
+def test_other_settings_are_recomputed(handler):
+    handler()
+    handler(max_characters_per_chunk=10)
+    assert CountingService.calls == 2
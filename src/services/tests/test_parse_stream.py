@@ -0,0 +1,80 @@
+import asyncio
+import gc
+import json
+
+import pytest
+
+import parse.service as parse_service
+from _exceptions import TooManyRequestsError
+from _executor import BoundedExecutor
+from parse.model import ParseFileRequest
+from parse.service import ParseHandler
+
+
+@pytest.fixture
+def pool():
+    return BoundedExecutor("test", max_workers=1, max_queue=0, intra_op_threads=None)
+
+
+def test_iterate_admits_before_the_first_item(pool):
+    async def main():
+        first = pool.iterate(lambda: iter([1, 2]))
+        # the pool is full as soon as iterate returns, not on first iteration
+        with pytest.raises(TooManyRequestsError):
+            pool.iterate(lambda: iter([3]))
+        return [item async for item in first]
+
+    assert asyncio.run(main()) == [1, 2]
+    assert pool.stats()["pending"] == 0
+
+
+def test_iterator_dropped_before_it_starts_releases_its_slot(pool):
+    iterator = pool.iterate(lambda: iter([1]))
+    assert pool.stats()["pending"] == 1
+    del iterator
+    gc.collect()
+    assert pool.stats()["pending"] == 0
+
+
+class StreamingService:
+    executor = None
+
+    def __init__(self, file_stream, metadata, parser_request):
+        self.file_stream = file_stream
+
+    def stream(self):
+        return self.executor.iterate(self._iter_output)
+
+    def _iter_output(self):
+        yield from ({"text": word} for word in self.file_stream.read().decode().split())
+
+
+@pytest.fixture
+def handler(monkeypatch, pool):
+    StreamingService.executor = pool
+    monkeypatch.setitem(parse_service.services, "text", StreamingService)
+    monkeypatch.setattr(parse_service, "parse_cache", None)
+
+    async def stream():
+        request = ParseFileRequest(contents="streamed parse output")
+        handler = ParseHandler(file_url=None, contents=request.contents)
+        lines = await handler.parse_stream("text", request)
+        return [json.loads(line) async for line in lines]
+
+    return stream
+
+
+def test_stream_yields_output_then_metadata(handler):
+    lines = asyncio.run(handler())
+    assert [line["output"]["text"] for line in lines[:-1]] == [
+        "streamed",
+        "parse",
+        "output",
+    ]
+    assert lines[-1]["metadata"]["filename"] == "file.txt"
+
+
+def test_full_pool_raises_before_the_response_starts(handler, pool):
+    pool._admit()
+    with pytest.raises(TooManyRequestsError):
+        asyncio.run(handler())
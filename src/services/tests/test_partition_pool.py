@@ -0,0 +1,58 @@
+import os
+import threading
+import time
+
+import pytest
+
+from _exceptions import InternalServerError
+from parse.text.pool import PartitionPool
+
+
+def sleep(seconds):
+    # runs in a partition worker process
+    time.sleep(seconds)
+    return os.getpid()
+
+
+@pytest.fixture(scope="module")
+def partition_pool():
+    partition_pool = PartitionPool(max_workers=2, timeout=1.5)
+    partition_pool.warmup()
+    return partition_pool
+
+
+def test_timeout_counts_from_when_a_job_starts(partition_pool):
+    # four 1s jobs on two workers take 2s, longer than the timeout, but no
+    # single job does
+    pids = list(partition_pool._iter_run([(sleep, (1,))] * 4))
+    assert len(set(pids)) == 2
+
+
+def test_time_between_results_is_not_counted(partition_pool):
+    for _ in partition_pool._iter_run([(sleep, (0.5,))] * 2):
+        time.sleep(2)
+
+
+def test_hung_job_only_recycles_its_own_worker(partition_pool):
+    other = {}
+
+    def run_other():
+        other["pids"] = list(partition_pool._iter_run([(sleep, (1.2,))]))
+
+    thread = threading.Thread(target=run_other)
+    thread.start()
+    time.sleep(0.1)
+    recycles = partition_pool.stats()["recycles"]
+    with pytest.raises(InternalServerError):
+        list(partition_pool._iter_run([(sleep, (5,))]))
+    thread.join()
+
+    # the job running next to the hung one finished normally
+    assert len(other["pids"]) == 1
+    stats = partition_pool.stats()
+    assert stats["recycles"] == recycles + 1
+    assert stats["timeouts"] >= 1
+    assert stats["running"] == 0
+
+    # the replacement worker takes jobs right away
+    assert len(list(partition_pool._iter_run([(sleep, (0.1,))] * 2))) == 2
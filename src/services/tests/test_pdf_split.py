@@ -0,0 +1,140 @@
+import pytest
+from pypdf import PdfReader, PdfWriter
+from unstructured.documents.elements import ElementMetadata, NarrativeText
+
+import config
+import parse.text.parsers.pdf as pdf_parser
+import parse.text.pool as pool
+from parse.model import ParseFileRequest
+from parse.text.parsers.pdf import PDFParser
+from parse.text.pool import PartitionPool, page_ranges
+
+PAGES = 10
+
+
+def fake_partition(file_type, path, settings):
+    # one element per page, numbered within the file it was given, which
+    # tells the pages apart by their widths
+    return [
+        NarrativeText(
+            f"page of width {int(page.mediabox.width)}",
+            metadata=ElementMetadata(page_number=number),
+        )
+        for number, page in enumerate(PdfReader(path).pages, start=1)
+    ]
+
+
+class InProcess:
+    """Stands in for PartitionPool._iter_run, recording the jobs it was given."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def __call__(self, jobs):
+        self.jobs.append(jobs)
+        for function, args in jobs:
+            yield function(*args)
+
+
+@pytest.fixture
+def pdf(tmp_path, monkeypatch):
+    monkeypatch.setattr(pool, "_partition", fake_partition)
+    writer = PdfWriter()
+    for page in range(PAGES):
+        writer.add_blank_page(width=100 + page, height=100)
+    path = tmp_path / "document.pdf"
+    writer.write(path)
+    return str(path)
+
+
+@pytest.fixture
+def partition_pool(monkeypatch):
+    partition_pool = PartitionPool(max_workers=2, timeout=60)
+    partition_pool.runs = InProcess()
+    monkeypatch.setattr(partition_pool, "_iter_run", partition_pool.runs)
+    return partition_pool
+
+
+def expected_elements(start=0, stop=PAGES):
+    return [
+        (number + 1, f"page of width {100 + number}") for number in range(start, stop)
+    ]
+
+
+def summary(elements):
+    return [(element.metadata.page_number, element.text) for element in elements]
+
+
+@pytest.mark.parametrize("page_count, parts", [(10, 2), (10, 3), (7, 4), (3, 3)])
+def test_page_ranges_cover_every_page_once(page_count, parts):
+    ranges = page_ranges(page_count, parts)
+    assert len(ranges) == parts
+    assert ranges[0][0] == 0 and ranges[-1][1] == page_count
+    assert all(stop == start for (_, stop), (start, _) in zip(ranges, ranges[1:]))
+    sizes = [stop - start for start, stop in ranges]
+    assert max(sizes) - min(sizes) <= 1
+
+
+def test_page_numbers_are_offset_to_the_original_document(pdf):
+    elements = pool._partition_pdf_pages(pdf, 4, 7, {})
+    assert summary(elements) == expected_elements(4, 7)
+
+
+@pytest.mark.parametrize("workers", [2, 3, 4])
+def test_split_partition_merges_ranges_in_page_order(
+    pdf, partition_pool, monkeypatch, workers
+):
+    monkeypatch.setitem(config.parse, "pdf_split_threshold", 4)
+    monkeypatch.setitem(config.parse, "pdf_split_workers", workers)
+    split = partition_pool.partition_pdf(pdf, {})
+    assert len(partition_pool.runs.jobs[-1]) == workers
+
+    monkeypatch.setitem(config.parse, "pdf_split_threshold", PAGES + 1)
+    whole = partition_pool.partition_pdf(pdf, {})
+    assert summary(split) == summary(whole) == expected_elements()
+
+
+@pytest.mark.parametrize("batch", [1, 3, 4])
+def test_stream_batches_have_fixed_page_counts(pdf, partition_pool, monkeypatch, batch):
+    monkeypatch.setitem(config.parse, "pdf_stream_pages", batch)
+    batches = list(partition_pool.iter_partition_pdf(pdf, {}))
+    assert [len(elements) for elements in batches[:-1]] == [batch] * (len(batches) - 1)
+    assert 0 < len(batches[-1]) <= batch
+    merged = [element for elements in batches for element in elements]
+    assert summary(merged) == expected_elements()
+
+
+def test_small_pdfs_stream_in_one_batch(pdf, partition_pool, monkeypatch):
+    monkeypatch.setitem(config.parse, "pdf_stream_pages", PAGES)
+    assert len(list(partition_pool.iter_partition_pdf(pdf, {}))) == 1
+    # partitioned as a whole, without cutting page ranges out of it
+    [[(function, _)]] = partition_pool.runs.jobs
+    assert function is fake_partition
+
+
+def test_parse_chunks_across_batches_and_stream_within_them(
+    pdf, partition_pool, monkeypatch
+):
+    monkeypatch.setattr(pdf_parser, "partition_pool", partition_pool)
+    monkeypatch.setitem(config.parse, "pdf_split_threshold", 4)
+    monkeypatch.setitem(config.parse, "pdf_stream_pages", 4)
+
+    class File:
+        path = pdf
+
+    params = ParseFileRequest(max_characters_per_chunk=200)
+    parsed = PDFParser().parse(File, params)
+    streamed = list(PDFParser().iter_output(File, params))
+
+    # the same text, but a streamed chunk never spans two batches of 4 pages
+    assert " ".join(chunk["text"] for chunk in parsed) == " ".join(
+        chunk["text"] for chunk in streamed
+    )
+    assert any(
+        chunk["metadata"]["page_number"] <= 4 and "width 104" in chunk["text"]
+        for chunk in parsed
+    )
+    assert not any(
+        chunk["metadata"]["page_number"] <= 4 and "width 104" in chunk["text"]
+        for chunk in streamed
+    )
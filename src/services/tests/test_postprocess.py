@@ -0,0 +1,54 @@
+import pytest
+from unstructured.documents.elements import ElementMetadata, NarrativeText, Text, Title
+
+from benchmarks.postprocess import old_postprocess, new_postprocess
+from parse.model import ParseFileRequest
+
+PARAGRAPH = (
+    "The quarterly  report covers revenue, costs and  outlook for each region,"
+    " including the well-known long-term  contracts signed this year. "
+)
+
+
+def make_elements(pages=10):
+    # no bullets, which are now stripped from every element rather than per chunk
+    elements = []
+    for page in range(1, pages + 1):
+        metadata = dict(page_number=page, languages=["eng"])
+        elements.append(Title(f"Section {page}", metadata=ElementMetadata(**metadata)))
+        for _ in range(3):
+            elements.append(
+                NarrativeText(PARAGRAPH * 2, metadata=ElementMetadata(**metadata))
+            )
+    return elements
+
+
+@pytest.mark.parametrize("should_chunk", [True, False])
+@pytest.mark.parametrize("clean_text", [True, False])
+def test_output_matches_per_chunk_cleaning(should_chunk, clean_text):
+    params = ParseFileRequest(
+        should_chunk=should_chunk,
+        clean_text=clean_text,
+        max_characters_per_chunk=500,
+    )
+    old = old_postprocess(make_elements(), params)
+    new = new_postprocess(make_elements(), params)
+    if should_chunk:
+        old = [chunk["text"] for chunk in old]
+        new = [chunk["text"] for chunk in new]
+    assert new == old
+
+
+@pytest.mark.parametrize("should_chunk", [True, False])
+def test_no_space_before_punctuation_elements(should_chunk):
+    elements = [
+        Title("Total"),
+        Text(":"),
+        NarrativeText("42 units"),
+        Text("."),
+        NarrativeText("Done!"),
+    ]
+    params = ParseFileRequest(should_chunk=should_chunk, max_characters_per_chunk=500)
+    output = new_postprocess(elements, params)
+    text = output[0]["text"] if should_chunk else output
+    assert text == "Total: 42 units. Done!"
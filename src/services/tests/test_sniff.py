@@ -0,0 +1,43 @@
+import pytest
+
+from parse.utils import SNIFF_BLOCK_SIZE, get_magika, sniff_bytes
+
+HTML = (
+    b"<!DOCTYPE html><html><head><title>report</title></head><body>"
+    + b"<p>hello world</p>\n" * 800
+    + b"</body></html>"
+)
+PYTHON = b"import os\n\n\ndef f(x):\n    return x + 1\n" * 600
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        HTML,
+        PYTHON,
+        b" \n\t" * 3000 + HTML + b"\n " * 5000,
+        b"\n" * 20000 + PYTHON + b" " * 10000,
+        b" " * 20000 + b"a short note between whitespace" + b"\n" * 20000,
+        b" " * 50000,
+        b"  tiny  ",
+    ],
+    ids=[
+        "html",
+        "python",
+        "padded-html",
+        "padded-python",
+        "padded-text",
+        "blank",
+        "tiny",
+    ],
+)
+def test_sniffed_label_matches_full_buffer(content):
+    magika = get_magika()
+    sample = sniff_bytes(memoryview(content))
+    assert len(sample) <= 3 * SNIFF_BLOCK_SIZE
+    assert magika._extract_features_from_bytes(sample) == (
+        magika._extract_features_from_bytes(content)
+    )
+    assert magika.identify_bytes(sample).output.ct_label == (
+        magika.identify_bytes(content).output.ct_label
+    )
@@ -0,0 +1,110 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+
+from config import downloads as download_config
+from _exceptions import BadRequestError
+from _http import http_pool
+from _spool import SpooledFile
+from _utils import download_file
+
+DATA = bytes(range(256)) * 64
+
+
+def write_in_pieces(spool, data, size=1000):
+    for start in range(0, len(data), size):
+        spool.write(data[start : start + size])
+
+
+def test_stays_in_memory_up_to_max_memory():
+    with SpooledFile(max_memory=len(DATA)) as spool:
+        write_in_pieces(spool, DATA)
+        assert not spool.on_disk
+        assert spool.size == len(DATA)
+        with spool.view() as view:
+            assert bytes(view) == DATA
+
+
+@pytest.mark.parametrize("max_memory", [0, 1000, len(DATA) - 1])
+def test_rolls_over_without_losing_data(max_memory):
+    with SpooledFile(max_memory=max_memory, suffix=".bin") as spool:
+        write_in_pieces(spool, DATA)
+        assert spool.on_disk
+        assert spool.size == len(DATA)
+        assert spool.tell() == len(DATA)
+        with spool.view() as view:
+            assert bytes(view) == DATA
+        spool.seek(0)
+        assert spool.read() == DATA
+        with open(spool.path, "rb") as f:
+            assert f.read() == DATA
+
+
+def test_path_rolls_over_at_the_same_position():
+    with SpooledFile(max_memory=len(DATA)) as spool:
+        spool.write(DATA)
+        spool.seek(10)
+        path = spool.path
+        assert spool.on_disk
+        assert os.path.exists(path)
+        assert spool.read(5) == DATA[10:15]
+
+
+def test_close_deletes_the_file_on_disk():
+    spool = SpooledFile(max_memory=0)
+    spool.write(DATA)
+    path = spool.path
+    spool.close()
+    assert spool.closed
+    assert not os.path.exists(path)
+
+
+def test_empty_file_on_disk_has_an_empty_view():
+    with SpooledFile(max_memory=0) as spool:
+        spool.path
+        with spool.view() as view:
+            assert bytes(view) == b""
+
+
+def serve(body, content_length=True):
+    async def chunks():
+        for start in range(0, len(body), 4096):
+            yield body[start : start + 4096]
+
+    def handler(request):
+        if content_length:
+            return httpx.Response(200, content=body)
+        # a generator body is sent without content-length
+        return httpx.Response(200, content=chunks())
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture
+def small_downloads(monkeypatch):
+    monkeypatch.setitem(download_config, "memory_threshold_mb", 0)
+    monkeypatch.setitem(download_config, "chunk_size", 1000)
+    monkeypatch.setitem(download_config, "tmp_dir", None)
+
+
+@pytest.mark.parametrize("content_length", [True, False])
+def test_download_spools_the_whole_body(monkeypatch, small_downloads, content_length):
+    monkeypatch.setattr(http_pool, "_client", serve(DATA, content_length))
+    spool, _ = asyncio.run(download_file("https://example.com/file.bin"))
+    with spool:
+        assert spool.on_disk
+        assert spool.tell() == 0
+        assert spool.read() == DATA
+
+
+@pytest.mark.parametrize("content_length", [True, False])
+def test_download_over_the_limit_is_rejected(
+    monkeypatch, small_downloads, content_length
+):
+    monkeypatch.setitem(download_config, "max_size_mb", 1)
+    body = b"x" * (1024 * 1024 + 1)
+    monkeypatch.setattr(http_pool, "_client", serve(body, content_length))
+    with pytest.raises(BadRequestError):
+        asyncio.run(download_file("https://example.com/file.bin"))
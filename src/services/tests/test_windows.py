@@ -0,0 +1,60 @@
+import pytest
+import torch
+import torch.nn.functional as F
+
+from _exceptions import BadRequestError
+
+from conftest import WORDS
+
+LONG = " ".join(WORDS * 5)
+
+
+def manual_pooling(service, text, overlap, weighted):
+    # every window embedded on its own, then pooled by hand
+    windows = service.tokenizer(
+        text,
+        truncation=True,
+        max_length=service.config.max_position_embeddings,
+        stride=overlap,
+        return_overflowing_tokens=True,
+    )["input_ids"]
+    embeddings, weights = [], []
+    for input_ids in windows:
+        encoded = {
+            "input_ids": torch.tensor([input_ids]),
+            "attention_mask": torch.ones(1, len(input_ids), dtype=torch.long),
+        }
+        embeddings.append(service._embed(encoded, normalize=False)[0])
+        weights.append(len(input_ids) if weighted else 1)
+    weights = torch.tensor(weights, dtype=embeddings[0].dtype)
+    pooled = (torch.stack(embeddings) * weights.unsqueeze(1)).sum(0) / weights.sum()
+    return F.normalize(pooled, p=2, dim=0), len(windows)
+
+
+def test_short_input_is_one_window_equal_to_plain_encoding(text_service, sentences):
+    embeddings, windows = text_service.encode_windowed(
+        sentences[:3], overlap=4, pooling="mean"
+    )
+    assert windows == [1, 1, 1]
+    torch.testing.assert_close(embeddings, text_service._encode(sentences[:3]))
+
+
+@pytest.mark.parametrize("pooling", ["mean", "weighted"])
+def test_long_input_pools_its_windows(text_service, pooling):
+    # more windows than max_windows, so they are encoded in several groups
+    embeddings, windows = text_service.encode_windowed(
+        ["notice", LONG], overlap=4, pooling=pooling
+    )
+    expected, count = manual_pooling(
+        text_service, LONG, overlap=4, weighted=pooling == "weighted"
+    )
+    assert windows == [1, count]
+    assert count > text_service.max_windows
+    torch.testing.assert_close(embeddings[1], expected, atol=1e-5, rtol=1e-4)
+    torch.testing.assert_close(embeddings.norm(dim=1), torch.ones(2))
+
+
+@pytest.mark.parametrize("overlap", [-1, 16])
+def test_overlap_must_leave_room_for_new_tokens(text_service, overlap):
+    with pytest.raises(BadRequestError):
+        text_service.encode_windowed([LONG], overlap=overlap, pooling="mean")